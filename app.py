@@ -1,8 +1,18 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-import joblib
-import re
+import hmac
 import os
+import threading
+import time
+import metrics
+from metrics import ANALYZE_ESCALATIONS, ANALYZE_REQUESTS, CACHE_LOOKUPS, HTTP_REQUESTS, HTTP_SECONDS, timed
+from micro_batcher import MicroBatcher
+from near_duplicate import NearDuplicateIndex
+from model_bundle import CanaryError, ModelBundle
+from predict_simple import CANARY_CASES
+from scoring_pool import ScoringPool
+from prediction_cache import PredictionCache, SQLitePredictionCache, cache_key
+from verify_jobs import JobStore, QueueFull, VerifyQueue
 
 app = Flask(__name__)
 CORS(app, resources={
@@ -13,40 +23,393 @@ CORS(app, resources={
     }
 })
 
-# Model paths
+# Model paths (the compact artifact is used when present)
 MODEL_PATH = 'simple_model.pkl'
 VECTORIZER_PATH = 'simple_vectorizer.pkl'
+ARTIFACT_DIR = 'simple_model_artifact'
+
+# Request limits
+MIN_TEXT_LENGTH = 10
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', '256'))
+
+# Number of scoring processes (0 = score inside the API process)
+SCORING_WORKERS = int(os.getenv('SCORING_WORKERS', '0'))
+
+# Coalesce concurrent /api/predict calls into batches of up to N texts; under
+# contention wait at most this many milliseconds for a batch to fill (size 0 = off)
+MICRO_BATCH_SIZE = int(os.getenv('MICRO_BATCH_SIZE', '32'))
+MICRO_BATCH_WAIT_MS = float(os.getenv('MICRO_BATCH_WAIT_MS', '1'))
+
+# Score with the pure-NumPy fast path when the model supports it (0 = always use sklearn)
+FAST_SCORER = os.getenv('FAST_SCORER', '1') != '0'
+
+# Hot reload: poll the model files every N seconds (0 = off), and reject a new
+# model that gets more than N canary cases fewer right than the current one
+MODEL_WATCH_INTERVAL = float(os.getenv('MODEL_WATCH_INTERVAL', '0'))
+CANARY_MAX_REGRESSION = int(os.getenv('CANARY_MAX_REGRESSION', '1'))
+
+# Background fact-check jobs (claim extraction + web search) for /api/verify
+VERIFY_WORKERS = int(os.getenv('VERIFY_WORKERS', '2'))
+VERIFY_QUEUE_SIZE = int(os.getenv('VERIFY_QUEUE_SIZE', '100'))
+VERIFY_JOBS_DB = os.getenv('VERIFY_JOBS_DB', 'verify_jobs.db')
+# A status stream holds a request thread, so it ends after this many seconds
+# and the client reconnects
+VERIFY_STREAM_SECONDS = float(os.getenv('VERIFY_STREAM_SECONDS', '5'))
+
+# /api/analyze escalates articles whose probability of being real falls in
+# [ANALYZE_UNCERTAIN_LOW, ANALYZE_UNCERTAIN_HIGH] to claim verification, and
+# waits up to ANALYZE_WAIT_SECONDS for it before answering with the job.
+# The wait holds a gunicorn request thread, so keep it short (0 answers at once)
+ANALYZE_UNCERTAIN_LOW = float(os.getenv('ANALYZE_UNCERTAIN_LOW', '0.2'))
+ANALYZE_UNCERTAIN_HIGH = float(os.getenv('ANALYZE_UNCERTAIN_HIGH', '0.8'))
+ANALYZE_WAIT_SECONDS = float(os.getenv('ANALYZE_WAIT_SECONDS', '3'))
+ANALYZE_TIERS = ('classifier', 'verification')
+ANALYZE_OUTCOMES = ('verified', 'inconclusive', 'pending', 'failed', 'rejected')
+
+# Token for /api/admin/* (unset = admin endpoints disabled)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+# Prediction cache (size 0 disables it; a DB path shares it between workers)
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', '10000'))
+PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', '3600'))
+PREDICTION_CACHE_DB = os.getenv('PREDICTION_CACHE_DB')
+
+# Near-duplicate index: articles of at least NEAR_DUP_MIN_WORDS words whose
+# estimated shingle similarity to an already scored or verified one reaches
+# the threshold reuse its result (size 0 disables it). /api/verify always uses
+# it when enabled; the classifier only with PREDICT_NEAR_DUP=1, since computing
+# a signature costs about as much as scoring the text with TF-IDF
+NEAR_DUP_SIZE = int(os.getenv('NEAR_DUP_SIZE', '10000'))
+NEAR_DUP_THRESHOLD = float(os.getenv('NEAR_DUP_THRESHOLD', '0.9'))
+NEAR_DUP_MIN_WORDS = int(os.getenv('NEAR_DUP_MIN_WORDS', '50'))
+PREDICT_NEAR_DUP = os.getenv('PREDICT_NEAR_DUP', '0') == '1'
 
 # Global variables
-model = None
-vectorizer = None
+bundle = None  # current ModelBundle; replaced in one assignment on reload
+scoring_pool = None
+_pool_lock = threading.Lock()
+verify_queue = None
+_verify_lock = threading.Lock()
+_reload_lock = threading.Lock()
+_watcher = None
+_draining = False  # set on SIGTERM (gunicorn) so /api/ready fails while requests drain
+reload_stats = {'reloads': 0, 'rejected': 0, 'last_error': None}
 
-def load_model():
-    """Load the trained model and vectorizer"""
-    global model, vectorizer
+if PREDICTION_CACHE_SIZE <= 0:
+    prediction_cache = None
+elif PREDICTION_CACHE_DB:
+    prediction_cache = SQLitePredictionCache(PREDICTION_CACHE_DB, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+else:
+    prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+def _near_duplicate_index():
+    if NEAR_DUP_SIZE <= 0:
+        return None
+    return NearDuplicateIndex(NEAR_DUP_THRESHOLD, min_words=NEAR_DUP_MIN_WORDS, max_entries=NEAR_DUP_SIZE)
+
+near_duplicates = _near_duplicate_index() if PREDICT_NEAR_DUP else None  # predictions of the current model
+
+def reload_model():
+    """Load the model files into a new bundle, canary-check it and swap it in
+
+    Requests already running keep the bundle they started with. If loading
+    or the canary check fails, the current model keeps serving. Returns
+    (ok, message).
+    """
+    global bundle
+    if not _reload_lock.acquire(blocking=False):
+        return False, 'A reload is already in progress'
     try:
-        model = joblib.load(MODEL_PATH)
-        vectorizer = joblib.load(VECTORIZER_PATH)
-        print("✓ Model and vectorizer loaded successfully")
-        return True
+        candidate = ModelBundle.load(ARTIFACT_DIR, MODEL_PATH, VECTORIZER_PATH, FAST_SCORER)
+        current = bundle
+        if current is not None and candidate.version == current.version:
+            return True, f'Model {current.version} is already loaded'
+        
+        correct = candidate.canary(CANARY_CASES)
+        total = len(CANARY_CASES)
+        if current is not None:
+            baseline = current.canary(CANARY_CASES)
+            if correct < baseline - CANARY_MAX_REGRESSION:
+                raise CanaryError(
+                    f"Model {candidate.version} got {correct}/{total} canary cases right "
+                    f"(current model {current.version}: {baseline}/{total})"
+                )
+        
+        bundle = candidate
+        if prediction_cache is not None:
+            prediction_cache.clear()
+        if near_duplicates is not None:
+            near_duplicates.clear()
+        if scoring_pool is not None:
+            scoring_pool.reload()
+        reload_stats['reloads'] += 1
+        reload_stats['last_error'] = None
+        message = f"Model {candidate.version} loaded ({correct}/{total} canary cases correct)"
+        print(f"✓ {message}")
+        return True, message
     except Exception as e:
+        reload_stats['rejected'] += 1
+        reload_stats['last_error'] = str(e)
         print(f"Error loading model: {e}")
-        return False
+        return False, str(e)
+    finally:
+        _reload_lock.release()
+
+def load_model():
+    """Load the trained model and vectorizer"""
+    return reload_model()[0]
+
+def _model_files_signature():
+    paths = [MODEL_PATH, VECTORIZER_PATH, os.path.join(ARTIFACT_DIR, 'manifest.json')]
+    return tuple(os.stat(path).st_mtime_ns if os.path.exists(path) else None for path in paths)
+
+def start_model_watcher(interval=None):
+    """Reload the model in a background thread whenever its files change
+
+    A change is only acted on once the files have been left alone for a
+    full interval, so a model that is still being written isn't loaded.
+    """
+    global _watcher
+    interval = MODEL_WATCH_INTERVAL if interval is None else interval
+    if interval <= 0 or _watcher is not None:
+        return
+    
+    def watch():
+        seen = _model_files_signature()
+        pending = None
+        while not _draining:
+            time.sleep(interval)
+            signature = _model_files_signature()
+            if signature == seen:
+                pending = None
+            elif signature == pending:
+                seen, pending = signature, None
+                reload_model()
+            else:
+                pending = signature
+    
+    _watcher = threading.Thread(target=watch, name='model-watcher', daemon=True)
+    _watcher.start()
+
+def create_app():
+    """Load the model once and return the Flask app
+
+    Production servers call this before forking workers (gunicorn
+    preload_app), so every worker shares the loaded model's memory pages.
+    """
+    if bundle is None and not load_model():
+        raise RuntimeError("Model could not be loaded")
+    return app
+
+def start_draining():
+    """Report not ready from now on; requests already running still finish"""
+    global _draining
+    _draining = True
+
+def shutdown():
+    """Stop reporting ready and release the scoring pool"""
+    start_draining()
+    if scoring_pool is not None:
+        scoring_pool.shutdown()
+    if verify_queue is not None:
+        verify_queue.shutdown()
+    if predict_batcher is not None:
+        predict_batcher.stop()
 
 def clean_text(text):
-    """Clean input text"""
-    text = str(text).lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    """Clean input text the same way the loaded model was trained"""
+    return bundle.normalizer.normalize(text)
+
+def get_scoring_pool():
+    """Start the scoring pool on first use when SCORING_WORKERS is set"""
+    global scoring_pool
+    if SCORING_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if scoring_pool is None:
+            scoring_pool = ScoringPool(
+                workers=SCORING_WORKERS,
+                model_path=MODEL_PATH,
+                vectorizer_path=VECTORIZER_PATH,
+                artifact_dir=ARTIFACT_DIR,
+                clean_fn=list  # texts arrive already normalized
+            )
+        return scoring_pool
+
+def get_verify_queue():
+    """Start the fact-check worker threads on first use"""
+    global verify_queue
+    with _verify_lock:
+        if verify_queue is None:
+            verify_queue = VerifyQueue(
+                JobStore(VERIFY_JOBS_DB),
+                workers=VERIFY_WORKERS,
+                max_pending=VERIFY_QUEUE_SIZE,
+                api_key=os.getenv('SERPAPI_API_KEY'),
+                near_duplicates=_near_duplicate_index()
+            )
+        return verify_queue
+
+def json_object():
+    """The request body if it is a JSON object, otherwise None"""
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else None
+
+def validate_text(text):
+    """Return an error message for unusable input, or None"""
+    if text and not isinstance(text, str):
+        return 'Text must be a string'
+    if not text or len(text.strip()) < MIN_TEXT_LENGTH:
+        return 'Text too short'
+    return None
+
+def format_result(proba, version):
+    """Build the API response for one row of predict_proba output"""
+    return {
+        'prediction': 'REAL' if proba[1] > proba[0] else 'FAKE',
+        'confidence': float(max(proba) * 100),
+        'probabilities': {
+            'fake': float(proba[0] * 100),
+            'real': float(proba[1] * 100)
+        },
+        'model_version': version
+    }
+
+def score_texts(texts):
+    """Score a list of texts with a single transform and predict_proba pass
+
+    Texts already in the prediction cache are answered from it, then
+    near-duplicates of recently scored articles; only the rest are
+    vectorized and scored. The whole call uses the model that
+    was current when it started, even if a reload swaps it meanwhile.
+    """
+    current = bundle
+    with timed('clean', len(texts)):
+        cleaned = current.normalizer.normalize_many(texts)
+    results = [None] * len(cleaned)
+    keys = None
+    if prediction_cache is not None:
+        keys = [cache_key(text, current.version) for text in cleaned]
+        results = [prediction_cache.get(key) for key in keys]
+    
+    misses = [i for i, result in enumerate(results) if result is None]
+    if keys is not None:
+        CACHE_LOOKUPS.inc(len(texts) - len(misses), cache='prediction', result='hit')
+        CACHE_LOOKUPS.inc(len(misses), cache='prediction', result='miss')
+    
+    signatures = {}
+    if near_duplicates is not None and misses:
+        with timed('near_duplicate', len(misses)):
+            for i in misses:
+                signature = near_duplicates.signature(cleaned[i])
+                if signature is None:
+                    continue
+                match = near_duplicates.lookup(cleaned[i], signature)
+                if match is not None and match[0]['model_version'] == current.version:
+                    results[i] = dict(match[0], near_duplicate=round(match[1], 3))
+                    CACHE_LOOKUPS.inc(cache='near_duplicate', result='hit')
+                    if keys is not None:
+                        prediction_cache.put(keys[i], results[i])
+                else:
+                    signatures[i] = signature
+                    CACHE_LOOKUPS.inc(cache='near_duplicate', result='miss')
+        misses = [i for i in misses if results[i] is None]
+    
+    if misses:
+        pool = get_scoring_pool()
+        if pool is not None:
+            with timed('predict', len(misses)):
+                probas = pool.predict_proba([cleaned[i] for i in misses], version=current.version)
+            # Workers that loaded other files than the approved model are not trusted
+            stale = [k for k, proba in enumerate(probas) if proba is None]
+            if stale:
+                for k, proba in zip(stale, current.predict_proba([cleaned[misses[k]] for k in stale])):
+                    probas[k] = proba
+        else:
+            probas = current.predict_proba([cleaned[i] for i in misses])
+        for i, proba in zip(misses, probas):
+            results[i] = format_result(proba, current.version)
+            if keys is not None:
+                prediction_cache.put(keys[i], results[i])
+            if i in signatures:
+                near_duplicates.add(cleaned[i], results[i], signatures[i])
+    
+    return [dict(result) for result in results]
+
+predict_batcher = (
+    MicroBatcher(lambda texts: score_texts(texts), MICRO_BATCH_SIZE, MICRO_BATCH_WAIT_MS)
+    if MICRO_BATCH_SIZE > 1 else None
+)
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request(response):
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    started = g.get('request_started')
+    if started is not None:
+        HTTP_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+    HTTP_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Stage latencies, cache hits, errors and batch sizes for Prometheus"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    current = bundle
+    health = {
         'status': 'healthy',
-        'model_loaded': model is not None
-    })
+        'model_loaded': current is not None,
+        'model_version': current.version if current else None,
+        'model': current.describe() if current else None,
+        'reloads': dict(reload_stats)
+    }
+    if scoring_pool is not None:
+        health['scoring_pool'] = scoring_pool.stats()
+    if prediction_cache is not None:
+        health['prediction_cache'] = prediction_cache.stats()
+    if near_duplicates is not None:
+        health['near_duplicates'] = near_duplicates.stats()
+    if verify_queue is not None:
+        health['verify_queue'] = verify_queue.describe()
+    if predict_batcher is not None:
+        health['micro_batching'] = predict_batcher.stats()
+    health['analyze'] = analyze_stats()
+    return jsonify(health)
+
+@app.route('/api/live', methods=['GET'])
+def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return jsonify({'status': 'alive'})
+
+@app.route('/api/ready', methods=['GET'])
+def readiness():
+    """Readiness probe: a model is loaded and the server isn't shutting down"""
+    if _draining:
+        return jsonify({'status': 'draining'}), 503
+    if bundle is None:
+        return jsonify({'status': 'loading'}), 503
+    return jsonify({'status': 'ready', 'model_version': bundle.version})
+
+@app.route('/api/admin/reload', methods=['POST'])
+def admin_reload():
+    """Load retrained model files without restarting the server"""
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Admin endpoints are disabled (set ADMIN_TOKEN)'}), 404
+    # compare_digest rejects non-ASCII str, and header values can be any latin-1 text
+    token = request.headers.get('X-Admin-Token', '')
+    if not hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+        return jsonify({'error': 'Invalid admin token'}), 403
+    
+    ok, message = reload_model()
+    response = {'ok': ok, 'message': message, 'model_version': bundle.version if bundle else None}
+    return jsonify(response), 200 if ok else 409
 
 @app.route('/api/predict', methods=['OPTIONS'])
 def handle_options():
@@ -58,30 +421,196 @@ def handle_options():
 @app.route('/api/predict', methods=['POST'])
 def predict():
     """Predict if news is fake or real"""
-    if model is None or vectorizer is None:
+    if bundle is None:
         return jsonify({'error': 'Model not loaded'}), 500
     
+    data = json_object()
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    
     try:
-        data = request.get_json()
         text = data.get('text', '')
         
-        if not text or len(text.strip()) < 10:
-            return jsonify({'error': 'Text too short'}), 400
+        error = validate_text(text)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        if predict_batcher is not None:
+            return jsonify(predict_batcher.submit(text))
+        return jsonify(score_texts([text])[0])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    """Predict a list of articles in one vectorized pass"""
+    if bundle is None:
+        return jsonify({'error': 'Model not loaded'}), 500
+    
+    data = json_object()
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    articles = data.get('articles')
+    if not isinstance(articles, list) or not articles:
+        return jsonify({'error': 'articles must be a non-empty list'}), 400
+    if len(articles) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Batch too large (max {MAX_BATCH_SIZE} articles)'}), 413
+    
+    # Validate every item up front; only the valid ones are scored
+    results = []
+    valid = []
+    for index, article in enumerate(articles):
+        if isinstance(article, dict):
+            article_id = article.get('id', index)
+            text = article.get('text', '')
+        else:
+            article_id = index
+            text = article
+        
+        error = validate_text(text)
+        results.append({'id': article_id, 'error': error} if error else {'id': article_id})
+        if not error:
+            valid.append((index, text))
+    
+    try:
+        if valid:
+            scored = score_texts([text for _, text in valid])
+            for (index, _), result in zip(valid, scored):
+                results[index].update(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({'results': results, 'count': len(results)})
+
+@app.route('/api/verify', methods=['POST'])
+def submit_verification():
+    """Queue a full fact-check (claims + web search); returns a job ID right away"""
+    data = json_object()
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    text = data.get('text', '')
+    error = validate_text(text)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    try:
+        job_id, deduplicated = get_verify_queue().submit(text)
+    except QueueFull as e:
+        response = jsonify({'error': f'Verification queue is full ({e}); try again later'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    
+    return jsonify({
+        'job_id': job_id,
+        'deduplicated': deduplicated,
+        'status_url': f'/api/verify/{job_id}'
+    }), 202
+
+@app.route('/api/verify/<job_id>', methods=['GET'])
+def verification_status(job_id):
+    """Progress and per-claim verdicts of a fact-check job
+
+    With `Accept: text/event-stream` (or ?stream=1) updates are pushed as
+    server-sent events until the job finishes or VERIFY_STREAM_SECONDS pass.
+    """
+    queue = get_verify_queue()
+    if request.args.get('stream') == '1' or request.accept_mimetypes.best == 'text/event-stream':
+        return Response(queue.events(job_id, timeout=VERIFY_STREAM_SECONDS), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache'})
+    
+    job = queue.store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+def analyze_stats():
+    """Answers per tier and how often (and how successfully) articles were escalated"""
+    answered = {tier: ANALYZE_REQUESTS.value(tier=tier) for tier in ANALYZE_TIERS}
+    outcomes = {outcome: ANALYZE_ESCALATIONS.value(outcome=outcome) for outcome in ANALYZE_OUTCOMES}
+    total = sum(answered.values())
+    escalated = sum(outcomes.values())
+    return {
+        'uncertain_band': [ANALYZE_UNCERTAIN_LOW, ANALYZE_UNCERTAIN_HIGH],
+        'requests': total,
+        'answered_by': answered,
+        'escalated': escalated,
+        'escalation_rate': round(escalated / total, 4) if total else 0.0,
+        'escalation_outcomes': outcomes
+    }
+
+def _escalate(text):
+    """Run claim verification for an article; returns (summary, outcome)"""
+    queue = get_verify_queue()
+    try:
+        job_id, _ = queue.submit(text)
+    except QueueFull as e:
+        return {'status': 'rejected', 'error': str(e)}, 'rejected'
+    
+    job = queue.wait(job_id, ANALYZE_WAIT_SECONDS)
+    summary = {'job_id': job_id, 'status_url': f'/api/verify/{job_id}', 'status': job['status']}
+    if job['status'] == 'failed':
+        summary['error'] = job['error']
+        return summary, 'failed'
+    if job['status'] != 'done':
+        return summary, 'pending'
+    
+    report = job['result']
+    summary['verdict'] = report['verdict']
+    summary['claims'] = [
+        {key: entry.get(key) for key in ('claim', 'verdict', 'status', 'reason')} for entry in report['claims']
+    ]
+    # Without a single claim checked against evidence (nothing extracted, no
+    # search results, out of time) the verdict says nothing about the article
+    verified = any(entry['status'] == 'verified' for entry in report['claims'])
+    return summary, 'verified' if verified else 'inconclusive'
+
+@app.route('/api/analyze', methods=['POST'])
+def analyze():
+    """Classify an article, escalating uncertain ones to claim verification
+
+    The classifier answers when it is confident. Otherwise the article is
+    fact-checked and, if any claim could be checked against evidence, the
+    verification verdict answers instead. `tier` says which one did. When
+    verification takes longer than ANALYZE_WAIT_SECONDS the response is
+    202 with the classifier's answer and the job to poll.
+    """
+    if bundle is None:
+        return jsonify({'error': 'Model not loaded'}), 500
+    
+    data = json_object()
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    text = data.get('text', '')
+    error = validate_text(text)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    try:
+        with timed('analyze_classifier'):
+            classifier = predict_batcher.submit(text) if predict_batcher is not None else score_texts([text])[0]
+        response = {
+            'tier': 'classifier',
+            'prediction': classifier['prediction'],
+            'escalated': False,
+            'classifier': classifier
+        }
+        status = 200
         
-        # Clean and predict
-        cleaned = clean_text(text)
-        vec = vectorizer.transform([cleaned])
-        prediction = model.predict(vec)[0]
-        proba = model.predict_proba(vec)[0]
+        real = classifier['probabilities']['real'] / 100
+        if ANALYZE_UNCERTAIN_LOW <= real <= ANALYZE_UNCERTAIN_HIGH:
+            with timed('analyze_verification'):
+                verification, outcome = _escalate(text)
+            ANALYZE_ESCALATIONS.inc(outcome=outcome)
+            response['escalated'] = True
+            response['verification'] = verification
+            if outcome == 'verified':
+                response['tier'] = 'verification'
+                response['prediction'] = verification['verdict'].upper()
+            elif outcome == 'pending':
+                status = 202
         
-        return jsonify({
-            'prediction': 'REAL' if prediction == 1 else 'FAKE',
-            'confidence': float(max(proba) * 100),
-            'probabilities': {
-                'fake': float(proba[0] * 100),
-                'real': float(proba[1] * 100)
-            }
-        })
+        ANALYZE_REQUESTS.inc(tier=response['tier'])
+        return jsonify(response), status
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -91,6 +620,7 @@ if __name__ == '__main__':
     print("="*60)
     
     if load_model():
+        start_model_watcher()
         print("\n✓ API ready!")
         print("Starting Flask server on http://localhost:5000")
         print("="*60 + "\n")
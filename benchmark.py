@@ -0,0 +1,242 @@
+"""
+Reproducible performance benchmarks for the classifier and verification paths
+
+    python benchmark.py --docs 2000 --words 300 --output bench.json
+    python benchmark.py --output new.json --compare bench.json --threshold 0.2
+
+Every benchmark times one item at a time over a seeded synthetic corpus (or
+a JSONL/CSV file) and reports throughput, p50/p95/p99 latency and peak
+Python allocations. Results are written as JSON so runs can be compared
+between commits; with --compare the script exits with status 1 when any
+benchmark got slower than the threshold allows.
+"""
+
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+FIXTURES_PATH = os.path.join('benchmark_fixtures', 'search_results.json')
+BENCHMARKS = ('clean_text', 'vectorizer_transform', 'model_predict_proba', 'fast_scorer',
+              'api_predict', 'extract_claims', 'verify_claim_with_results')
+
+COMMON_WORDS = ("the a of to and in that is for on with as was by at from it said "
+                "government people year new state officials report told week public "
+                "according former president minister city country group million").split()
+REAL_WORDS = ("reuters washington statement spokesman parliament budget economy percent "
+              "committee agency court ruling election senate policy trade minister").split()
+FAKE_WORDS = ("shocking breaking secret truth exposed hoax conspiracy insane watch "
+              "destroyed hillary obama video liberals globalist elite cover-up!!!").split()
+
+def synthetic_corpus(n_docs, words, seed=0):
+    """Articles of roughly `words` words, alternating real- and fake-flavoured vocabulary"""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n_docs):
+        flavour = FAKE_WORDS if i % 2 else REAL_WORDS
+        length = max(5, int(rng.gauss(words, words / 4)))
+        tokens = [rng.choice(flavour) if rng.random() < 0.3 else rng.choice(COMMON_WORDS) for _ in range(length)]
+        sentences = [' '.join(tokens[j:j + 15]).capitalize() + '.' for j in range(0, length, 15)]
+        docs.append(' '.join(sentences))
+    return docs
+
+def load_corpus(path, text_field='text', limit=None):
+    """Texts from a JSONL or CSV file"""
+    from itertools import islice
+    from predict_simple import read_records, usable
+
+    fmt = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return [text for _, text in islice(read_records(f, fmt, text_field), limit) if usable(text)]
+
+def measure(fn, items, warmup=5, memory_items=50):
+    """Time fn on every item; returns throughput, latency percentiles and peak allocations"""
+    for item in items[:warmup]:
+        fn(item)
+
+    samples = []
+    started = time.perf_counter()
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - start)
+    total = time.perf_counter() - started
+
+    # Separate pass: tracemalloc slows everything down, so it isn't timed
+    tracemalloc.start()
+    for item in items[:memory_items]:
+        fn(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(np.array(samples) * 1000, [50, 95, 99])
+    return {
+        'items': len(items),
+        'throughput_per_sec': round(len(items) / total, 2),
+        'mean_ms': round(total * 1000 / len(items), 4),
+        'p50_ms': round(float(p50), 4),
+        'p95_ms': round(float(p95), 4),
+        'p99_ms': round(float(p99), 4),
+        'peak_alloc_mb': round(peak / 1e6, 3)
+    }
+
+def run_benchmarks(texts, only=None, claim_docs=200, fixture_repeat=20):
+    """Run each selected benchmark; unavailable ones are reported as skipped"""
+    import app
+
+    if not app.load_model():
+        raise SystemExit("Model could not be loaded; train it first (python train_simple_working.py)")
+    bundle = app.bundle
+    app.prediction_cache = None  # measure the uncached path
+    selected = only or BENCHMARKS
+    results = {}
+
+    def record(name, build):
+        if name not in selected:
+            return
+        print(f"  {name}...", file=sys.stderr)
+        try:
+            results[name] = build()
+        except ImportError as e:
+            results[name] = {'skipped': f"missing dependency: {e.name}"}
+        except FileNotFoundError as e:
+            results[name] = {'skipped': str(e)}
+
+    cleaned = bundle.normalizer.normalize_many(texts)
+    record('clean_text', lambda: measure(app.clean_text, texts))
+    record('vectorizer_transform', lambda: measure(lambda text: bundle.vectorizer.transform([text]), cleaned))
+
+    def predict_proba():
+        X = bundle.vectorizer.transform(cleaned)
+        return measure(bundle.model.predict_proba, [X[i] for i in range(X.shape[0])])
+    record('model_predict_proba', predict_proba)
+
+    def fast_scorer():
+        if bundle.scorer is None:
+            return {'skipped': 'model not supported by the fast scorer'}
+        return measure(lambda text: bundle.scorer.predict_proba([text]), cleaned)
+    record('fast_scorer', fast_scorer)
+
+    def api_predict():
+        client = app.app.test_client()
+        return measure(lambda text: client.post('/api/predict', json={'text': text}), texts)
+    record('api_predict', api_predict)
+
+    def extract_claims():
+        import spacy  # noqa: F401 - skip cleanly when spaCy isn't installed
+        import claim_extractor
+        claim_extractor.get_nlp()
+        return measure(claim_extractor.extract_claims, texts[:claim_docs])
+    record('extract_claims', extract_claims)
+
+    def verify_claim():
+        import sentence_transformers  # noqa: F401
+        import claim_extractor
+        with open(FIXTURES_PATH, encoding='utf-8') as f:
+            fixtures = json.load(f)
+        model = claim_extractor.get_sentence_model()
+        if model is None:
+            return {'skipped': 'sentence model could not be loaded'}
+        items = [(case['claim'], case['search_results']) for case in fixtures] * fixture_repeat
+        return measure(lambda item: claim_extractor.verify_claim_with_results(item[0], item[1], model), items)
+    record('verify_claim_with_results', verify_claim)
+
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, baseline, threshold):
+    """Regressions beyond threshold (e.g. 0.2 = 20%) in p50/p99 latency or throughput"""
+    regressions = []
+    print(f"\n{'benchmark':<28}{'p50 ms':>18}{'p99 ms':>18}{'items/sec':>22}")
+    for name, now in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before or 'skipped' in now or 'skipped' in before:
+            continue
+        changes = []
+        for key in ('p50_ms', 'p99_ms'):
+            change = now[key] / before[key] - 1 if before[key] else 0.0
+            changes.append(f"{now[key]:8.3f} ({change:+6.1%})")
+            if change > threshold:
+                regressions.append(f"{name} {key}: {before[key]} -> {now[key]} ({change:+.1%})")
+        change = now['throughput_per_sec'] / before['throughput_per_sec'] - 1
+        changes.append(f"{now['throughput_per_sec']:10.1f} ({change:+6.1%})")
+        if change < -threshold:
+            regressions.append(f"{name} throughput: {before['throughput_per_sec']} -> {now['throughput_per_sec']} ({change:+.1%})")
+        print(f"{name:<28}" + ''.join(f"{c:>18}" if i < 2 else f"{c:>22}" for i, c in enumerate(changes)))
+    return regressions
+
+if __name__ == "__main__":
+    import argparse
+    from train_simple_working import peak_rss_mb
+
+    parser = argparse.ArgumentParser(description='Benchmark the classifier and verification paths')
+    parser.add_argument('--docs', type=int, default=1000, help='synthetic articles to generate')
+    parser.add_argument('--words', type=int, default=300, help='mean words per synthetic article')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus', metavar='PATH', help='benchmark on a JSONL/CSV file instead')
+    parser.add_argument('--text-field', default='text')
+    parser.add_argument('--only', help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--claim-docs', type=int, default=200, help='articles for extract_claims (spaCy is slow)')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', metavar='BASELINE', help='fail if slower than this earlier result file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown for --compare (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    if args.corpus:
+        texts = load_corpus(args.corpus, args.text_field, args.docs)
+        corpus = {'path': args.corpus, 'docs': len(texts)}
+    else:
+        texts = synthetic_corpus(args.docs, args.words, args.seed)
+        corpus = {'synthetic': True, 'docs': args.docs, 'words': args.words, 'seed': args.seed}
+
+    only = [name.strip() for name in args.only.split(',')] if args.only else None
+    print(f"Benchmarking on {len(texts)} articles:", file=sys.stderr)
+    results = run_benchmarks(texts, only, args.claim_docs)
+
+    import sklearn
+    report = {
+        'commit': _git_commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'sklearn': sklearn.__version__,
+        'corpus': corpus,
+        'peak_rss_mb': peak_rss_mb(),
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'benchmark':<28}{'items/sec':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+    for name, result in results.items():
+        if 'skipped' in result:
+            print(f"{name:<28}  skipped ({result['skipped']})")
+        else:
+            print(f"{name:<28}{result['throughput_per_sec']:>12.1f}{result['p50_ms']:>10.3f}"
+                  f"{result['p95_ms']:>10.3f}{result['p99_ms']:>10.3f}{result['peak_alloc_mb']:>10.2f}")
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%} vs {baseline.get('commit')}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\n✓ No regressions beyond {args.threshold:.0%} vs {baseline.get('commit')}")
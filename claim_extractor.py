@@ -1,31 +1,191 @@
-import spacy
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+import logging
 import os
-from serpapi import GoogleSearch
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
 from urllib.parse import urlparse
-from sentence_transformers import SentenceTransformer, util
-
-# Load the English language model
-try:
-    nlp = spacy.load("en_core_web_sm")
-    print("spaCy model loaded successfully.")
-except OSError:
-    print("Downloading spaCy model. Please wait...")
-    spacy.cli.download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
-    print("spaCy model downloaded and loaded.")
-
-# Load Sentence Transformer model once
-print("\nLoading Sentence Transformer model...")
-try:
-    model_st = SentenceTransformer('all-MiniLM-L6-v2')
-    print("Sentence Transformer model loaded successfully.")
-except Exception as e:
-    print(f"Error loading Sentence Transformer model: {e}")
-    print("Please ensure you have internet access for the first run to download the model.")
-    model_st = None
+import numpy as np
+import search_cache
+from embedding_service import EmbeddingService
+from metrics import configure_logging, timed
+
+logger = logging.getLogger(__name__)
+
+# Pipeline components claim extraction never reads
+UNUSED_PIPES = ["lemmatizer"]
+SENTENCE_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Heavy models are loaded on first use (or by warmup()), not at import
+_nlp = None
+_nlp_lock = threading.Lock()
+_model_st = None
+_model_st_loaded = False
+_embedding_service = None
+_model_st_lock = threading.Lock()
+_load_seconds = {}
+
+def get_nlp():
+    """Return the spaCy pipeline, loading it on first use"""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+                start = time.perf_counter()
+                try:
+                    nlp = spacy.load("en_core_web_sm", disable=UNUSED_PIPES)
+                    logger.info("spaCy model loaded")
+                except OSError:
+                    logger.info("Downloading spaCy model, please wait...")
+                    spacy.cli.download("en_core_web_sm")
+                    nlp = spacy.load("en_core_web_sm", disable=UNUSED_PIPES)
+                    logger.info("spaCy model downloaded and loaded")
+                _load_seconds['spacy'] = time.perf_counter() - start
+                _nlp = nlp
+    return _nlp
+
+def _load_sentence_model():
+    global _model_st, _embedding_service, _model_st_loaded
+    with _model_st_lock:
+        if _model_st_loaded:
+            return
+        logger.info("Loading Sentence Transformer model...")
+        start = time.perf_counter()
+        try:
+            from sentence_transformers import SentenceTransformer
+            _model_st = SentenceTransformer(SENTENCE_MODEL_NAME)
+            logger.info("Sentence Transformer model loaded")
+        except Exception as e:
+            logger.error("Error loading Sentence Transformer model: %s "
+                         "(the first run needs internet access to download it)", e)
+            _model_st = None
+        _load_seconds['sentence_transformer'] = time.perf_counter() - start
+
+        # Batched, cached embeddings shared by every verification
+        if _model_st is not None:
+            _embedding_service = EmbeddingService(
+                _model_st,
+                model_name=SENTENCE_MODEL_NAME,
+                cache_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "50000")),
+                cache_path=os.getenv("EMBEDDING_CACHE_PATH") or None,
+                num_threads=int(os.getenv("EMBEDDING_THREADS", "0")) or None
+            )
+        _model_st_loaded = True
+
+def get_sentence_model():
+    """Return the SentenceTransformer (None if it failed to load), loading it on first use"""
+    if not _model_st_loaded:
+        _load_sentence_model()
+    return _model_st
+
+def get_embedding_service():
+    """Return the shared EmbeddingService (None without a sentence model)"""
+    if not _model_st_loaded:
+        _load_sentence_model()
+    return _embedding_service
+
+def _rss_mb():
+    """Current resident set size in MB, or None where it can't be measured"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError, AttributeError):
+        return None
 
-def extract_entities(text):
-    doc = nlp(text)
+def startup_report():
+    """Import/model load times and current memory use"""
+    rss = _rss_mb()
+    return {
+        'import_seconds': round(_IMPORT_SECONDS, 4),
+        'spacy_loaded': _nlp is not None,
+        'sentence_model_loaded': _model_st is not None,
+        'load_seconds': {name: round(seconds, 3) for name, seconds in _load_seconds.items()},
+        'rss_mb': round(rss, 1) if rss is not None else None
+    }
+
+def warmup():
+    """Load every model now, e.g. before a server starts taking traffic"""
+    get_nlp()
+    get_embedding_service()
+    return startup_report()
+
+def __getattr__(name):
+    # Keep `claim_extractor.nlp` / `claim_extractor.model_st` working, lazily
+    if name == 'nlp':
+        return get_nlp()
+    if name == 'model_st':
+        return get_sentence_model()
+    if name == 'embedding_service':
+        return get_embedding_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Concurrency and latency limits for verify_article()
+MAX_CONCURRENT_SEARCHES = int(os.getenv("MAX_CONCURRENT_SEARCHES", "8"))
+ARTICLE_TIME_BUDGET = float(os.getenv("ARTICLE_TIME_BUDGET", "30"))
+
+# Where evidence comes from: 'serpapi' (Google via SerpApi) or 'local' (the
+# offline BM25 + embedding index built with evidence_index.py)
+EVIDENCE_BACKEND = os.getenv("EVIDENCE_BACKEND", "serpapi")
+EVIDENCE_INDEX_PATH = os.getenv("EVIDENCE_INDEX_PATH", "evidence_index.db")
+EVIDENCE_VECTORS = os.getenv("EVIDENCE_VECTORS", "1") != "0"
+_evidence_index = None
+_evidence_index_lock = threading.Lock()
+
+# Verified claims reused for similar claims in later articles (empty path = off)
+CLAIM_STORE_PATH = os.getenv("CLAIM_STORE_PATH", "claim_store.db")
+CLAIM_STORE_THRESHOLD = float(os.getenv("CLAIM_STORE_THRESHOLD", "0.92"))
+CLAIM_STORE_TTL = float(os.getenv("CLAIM_STORE_TTL", str(30 * 86400)))
+_claim_store = None
+_claim_store_lock = threading.Lock()
+
+# Disk cache for search responses, created on first search
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+def get_search_cache():
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = search_cache.from_env()
+    return _search_cache
+
+def get_evidence_index():
+    """Return the local evidence index, opening it on first use"""
+    global _evidence_index
+    with _evidence_index_lock:
+        if _evidence_index is None:
+            from evidence_index import EvidenceIndex
+            service = get_embedding_service() if EVIDENCE_VECTORS else None
+            _evidence_index = EvidenceIndex(EVIDENCE_INDEX_PATH,
+                                            embed=service.encode if service is not None else None)
+            logger.info("Local evidence index opened: %s", _evidence_index.stats())
+    return _evidence_index
+
+def get_claim_store():
+    """Return the verified-claim store (None when disabled), opening it on first use"""
+    global _claim_store
+    if not CLAIM_STORE_PATH:
+        return None
+    with _claim_store_lock:
+        if _claim_store is None:
+            from claim_store import ClaimStore
+            _claim_store = ClaimStore(CLAIM_STORE_PATH, SENTENCE_MODEL_NAME, CLAIM_STORE_THRESHOLD, CLAIM_STORE_TTL)
+    return _claim_store
+
+def _run_search(params):
+    from serpapi import GoogleSearch
+    return GoogleSearch(params).get_dict()
+
+def _entities_from_doc(doc):
     entities = {}
     for ent in doc.ents:
         if ent.label_ not in entities:
@@ -33,8 +193,7 @@ def extract_entities(text):
         entities[ent.label_].append(ent.text)
     return entities
 
-def extract_claims(text):
-    doc = nlp(text)
+def _claims_from_doc(doc):
     claims = []
     for sent in doc.sents:
         subj = ""
@@ -62,7 +221,48 @@ def extract_claims(text):
             
     return list(set(claims))
 
+def analyze_doc(doc):
+    """Entities, sentences and claims from one parsed spaCy doc"""
+    return {
+        'entities': _entities_from_doc(doc),
+        'sentences': [sent.text.strip() for sent in doc.sents],
+        'claims': _claims_from_doc(doc)
+    }
+
+def _parse(text):
+    nlp = get_nlp()
+    with timed('parse'):
+        return nlp(text)
+
+def analyze_text(text):
+    """Parse text once and return its entities, sentences and claims"""
+    return analyze_doc(_parse(text))
+
+def analyze_texts(texts, batch_size=64, n_process=1):
+    """Yield analyze_text() results for many texts using nlp.pipe
+
+    n_process > 1 parses in worker processes; call it under
+    `if __name__ == "__main__":` on platforms that spawn.
+    """
+    for doc in get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process):
+        yield analyze_doc(doc)
+
+def extract_entities(text):
+    return _entities_from_doc(_parse(text))
+
+def extract_claims(text):
+    return _claims_from_doc(_parse(text))
+
 def search_google(query, api_key, entities=None):
+    if EVIDENCE_BACKEND == "local":
+        # Google's site: operators mean nothing locally; search for the claim itself
+        try:
+            with timed('search'):
+                return get_evidence_index().search(query, MAX_SEARCH_RESULTS)
+        except Exception as e:
+            logger.warning("Error during local evidence search: %s", e)
+            return None
+
     full_query = query
 
     if entities:
@@ -76,7 +276,7 @@ def search_google(query, api_key, entities=None):
             if "ambani" in relevant_entity.lower() or "reliance" in relevant_entity.lower():
                 full_query += " site:relianceindustries.com OR site:timesofindia.indiatimes.com OR site:ndtv.com"
             
-    print(f"    Generated Google Search Query: '{full_query}'")
+    logger.debug("Search query: %r", full_query)
 
     params = {
         "api_key": api_key,
@@ -86,115 +286,377 @@ def search_google(query, api_key, entities=None):
         "gl": "us"
     }
     try:
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        with timed('search'):
+            results = get_search_cache().fetch(params, _run_search)
+        if results is None:
+            logger.info("No cached response for %r (offline mode)", full_query)
         return results
     except Exception as e:
-        print(f"Error during Google search: {e}")
+        logger.warning("Error during Google search: %s", e)
         return None
 
-def verify_claim_with_results(claim, search_results, semantic_model=None, similarity_threshold=0.5):
-    if semantic_model is None:
-        print("    Semantic model not loaded. Skipping semantic verification.")
-        return "Fake"
-
-    lower_claim = claim.lower()
-    print(f"    Verifying claim: '{claim}' using semantic similarity")
-
-    claim_embedding = semantic_model.encode(claim, convert_to_tensor=True)
-
-    confirming_snippets_count = 0
-    contradicting_snippets_count = 0
+# Domains whose snippets count as reliable evidence. Entries match whole
+# trailing labels ("bbc.com" covers www.bbc.com); entries starting with a
+# dot match any label (".gov" covers nasa.gov and gov.uk hosts).
+RELIABLE_DOMAINS = [
+    "wikipedia.org", ".gov", "pmindia.gov.in", "nytimes.com", "bbc.com", 
+    "reuters.com", "cnn.com", "apnews.com", "washingtonpost.com",
+    "theguardian.com", "wsj.com", "bloomberg.com", "britannica.com",
+    "wildlifesos.org", "nationalgeographic.com", "scientificamerican.com",
+    "techcrunch.com", "theverge.com", "arstechnica.com", 
     
-    reliable_domains = [
-        "wikipedia.org", ".gov", "pmindia.gov.in", "nytimes.com", "bbc.com", 
-        "reuters.com", "cnn.com", "apnews.com", "washingtonpost.com",
-        "theguardian.com", "wsj.com", "bloomberg.com", "britannica.com",
-        "wildlifesos.org", "nationalgeographic.com", "scientificamerican.com",
-        "techcrunch.com", "theverge.com", "ars technica.com", 
-        
-        # --- NEW: Indian News and Government Domains ---
-        "timesofindia.indiatimes.com", "ndtv.com", "zeenews.india.com", 
-        "hindustantimes.com", "thehindu.com", "indianexpress.com", 
-        "businesstoday.in", "livemint.com", "moneycontrol.com",
-        "indiatoday.in", "republicworld.com", "wionews.com",
-        "nic.in", "gov.in", # General Indian Government domains
-        "pti.in", "ani.in", # Indian news agencies
-        # Add more as needed for specific technical/computer domains if relevant for news
-        # --- END NEW ---
-    ]
-
+    # --- Indian News and Government Domains ---
+    "timesofindia.indiatimes.com", "ndtv.com", "zeenews.india.com", 
+    "hindustantimes.com", "thehindu.com", "indianexpress.com", 
+    "businesstoday.in", "livemint.com", "moneycontrol.com",
+    "indiatoday.in", "republicworld.com", "wionews.com",
+    "nic.in", "gov.in", # General Indian Government domains
+    "pti.in", "ani.in", # Indian news agencies
+]
+_RELIABLE_SUFFIXES = frozenset(d for d in RELIABLE_DOMAINS if not d.startswith('.'))
+_RELIABLE_LABELS = frozenset(d[1:] for d in RELIABLE_DOMAINS if d.startswith('.'))
+
+# Negation words, found in one pass per snippet. "no evidence" only counts
+# against highly similar snippets; the rest also against moderately similar ones.
+_NEGATION_RE = re.compile(r"no evidence|not|false|incorrect|denied|refuted|rumor|hoax")
+_HOST_RE = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*://([^/?#]*)")
+
+# Search results considered per claim
+MAX_SEARCH_RESULTS = int(os.getenv("MAX_SEARCH_RESULTS", "5"))
+
+@lru_cache(maxsize=65536)
+def _domain_trust(domain):
+    """(is_reliable_source, is_generally_trustworthy) for a host name"""
+    labels = domain.lower().split(':')[0].split('.')
+    is_reliable = (not _RELIABLE_LABELS.isdisjoint(labels)
+                   or any('.'.join(labels[i:]) in _RELIABLE_SUFFIXES for i in range(len(labels))))
+    # Sources not in the list but that look like news outlets still count as trustworthy
+    is_trustworthy = is_reliable or "news" in domain or "report" in domain or "press" in domain
+    return is_reliable, is_trustworthy
+
+def _host(link):
+    """Network location of a URL (urlparse's netloc, without the parsing overhead)"""
+    match = _HOST_RE.match(link)
+    return match.group(1) if match else urlparse(link).netloc
+
+@lru_cache(maxsize=65536)
+def _negations(text):
+    """(has any negation, has a negation other than "no evidence")"""
+    found = set(_NEGATION_RE.findall(text.lower()))
+    return bool(found), bool(found - {"no evidence"})
+
+def _snippets_from_results(search_results, max_results=None):
+    snippets_to_analyze = []
     if search_results and 'organic_results' in search_results:
-        snippets_to_analyze = []
-        for result in search_results['organic_results'][:5]:
+        for result in search_results['organic_results'][:max_results or MAX_SEARCH_RESULTS]:
             snippet_text = result.get('snippet', '') + " " + result.get('title', '')
             link = result.get('link', '')
             
             if snippet_text.strip():
                 snippets_to_analyze.append({'text': snippet_text, 'link': link})
+    return snippets_to_analyze
+
+def score_evidence(claims, snippet_lists, claim_embeddings, snippet_embeddings, similarity_threshold=0.5,
+                   evidence=True):
+    """Classify every snippet of every claim at once and derive each claim's verdict
+
+    snippet_embeddings holds the rows of all snippet lists concatenated.
+    Returns one dict per claim with the verdict, the reason and the
+    confirmation/contradiction counts, plus per-snippet evidence unless
+    evidence=False.
+    """
+    sizes = [len(snippets) for snippets in snippet_lists]
+    owner = np.repeat(np.arange(len(claims)), sizes)
+    snippets = [snippet for snippet_list in snippet_lists for snippet in snippet_list]
+    domains = [_host(snippet['link']) for snippet in snippets]
+    trust = np.array([_domain_trust(domain) for domain in domains], dtype=bool).reshape(-1, 2)
+    negation = np.array([_negations(snippet['text']) for snippet in snippets], dtype=bool).reshape(-1, 2)
+    reliable, trustworthy = trust[:, 0], trust[:, 1]
+    any_negation, weak_negation = negation[:, 0], negation[:, 1]
+
+    if len(snippets):
+        a = claim_embeddings / np.maximum(np.linalg.norm(claim_embeddings, axis=1, keepdims=True), 1e-12)
+        b = snippet_embeddings / np.maximum(np.linalg.norm(snippet_embeddings, axis=1, keepdims=True), 1e-12)
+        similarity = np.einsum('ij,ij->i', a[owner], b)
+    else:
+        similarity = np.zeros(0)
+
+    similar = (similarity >= similarity_threshold) & trustworthy
+    confirming = similar & ~any_negation
+    contradicting = (similar & any_negation) | (~similar & (similarity > 0.4) & weak_negation & trustworthy)
+    confirmations = np.bincount(owner, weights=confirming, minlength=len(claims)).astype(int)
+    contradictions = np.bincount(owner, weights=contradicting, minlength=len(claims)).astype(int)
+
+    # Final verdict logic - highly tuned for high confidence 'Real' detection
+    leading = (confirmations > contradictions) & (confirmations > 0)
+    multiple = leading & (confirmations >= 2)
+    single = leading & ~multiple & (confirmations == 1) & (contradictions == 0) & (similarity_threshold > 0.6)
+    reasons = np.select(
+        [multiple, single, leading, contradictions > 0],
+        ["multiple strong confirmations, minimal contradictions",
+         "single very strong confirmation, no contradictions",
+         "some confirmations, but not strong enough for Real (conservative)",
+         "found contradictions"],
+        default="no strong confirmations or clear dominance of either"  # conservative default
+    )
+    real = multiple | single
+
+    results = [
+        {
+            'claim': claim,
+            'verdict': "Real" if real[k] else "Fake",
+            'reason': str(reasons[k]),
+            'confirmations': int(confirmations[k]),
+            'contradictions': int(contradictions[k])
+        }
+        for k, claim in enumerate(claims)
+    ]
+    if evidence:
+        outcome = np.select(
+            [confirming, similar & any_negation, contradicting],
+            ["strong confirmation", "potential contradiction", "explicit contradiction"],
+            default="neutral"
+        ).tolist()
+        similarity = similarity.tolist()
+        end = 0
+        for result, size in zip(results, sizes):
+            start, end = end, end + size
+            result['evidence'] = [
+                {
+                    'link': snippets[j]['link'],
+                    'domain': domains[j],
+                    'similarity': round(similarity[j], 4),
+                    'reliable': bool(reliable[j]),
+                    'trustworthy': bool(trustworthy[j]),
+                    'outcome': outcome[j]
+                }
+                for j in range(start, end)
+            ]
+    return results
+
+def verify_claims(claims_with_results, semantic_model, similarity_threshold=0.5, return_evidence=False):
+    """Verify several (claim, search_results) pairs with one embedding pass
+
+    semantic_model can be a SentenceTransformer or an EmbeddingService;
+    either way all claims and snippets are encoded in a single call.
+    Returns a verdict per claim, or score_evidence() dicts with
+    return_evidence=True.
+    """
+    snippet_lists = [_snippets_from_results(results) for _, results in claims_with_results]
+    claims = [claim for claim, _ in claims_with_results]
+    texts = claims + [s['text'] for snippets in snippet_lists for s in snippets]
+    with timed('embed', len(texts)):
+        embeddings = np.asarray(semantic_model.encode(texts))
+    
+    with timed('verdict', len(claims)):
+        debug = logger.isEnabledFor(logging.DEBUG)
+        results = score_evidence(claims, snippet_lists, embeddings[:len(claims)], embeddings[len(claims):],
+                                 similarity_threshold, evidence=return_evidence or debug)
+        for (claim, search_results), snippets, result in zip(claims_with_results, snippet_lists, results):
+            if search_results and 'organic_results' in search_results and not snippets:
+                result['verdict'], result['reason'] = "Fake", "no relevant snippets to analyze"
+    
+    for result in results:
+        if debug:
+            for item in result['evidence']:
+                logger.debug("Evidence for %r: %s", result['claim'], item)
+        logger.info("Claim %r -> %s (confirmations=%d, contradictions=%d): %s", result['claim'],
+                    result['verdict'], result['confirmations'], result['contradictions'], result['reason'])
+    if return_evidence:
+        return results
+    return [result['verdict'] for result in results]
+
+def verify_claim_with_results(claim, search_results, semantic_model=None, similarity_threshold=0.5,
+                              return_evidence=False):
+    if semantic_model is None:
+        logger.warning("Semantic model not loaded; skipping semantic verification")
+        return "Fake"
 
-        if not snippets_to_analyze:
-            print("      No relevant snippets to analyze for semantic similarity.")
-            return "Fake"
+    return verify_claims([(claim, search_results)], semantic_model, similarity_threshold, return_evidence)[0]
 
-        snippet_embeddings = semantic_model.encode([s['text'] for s in snippets_to_analyze], convert_to_tensor=True)
+def _search_claim(claim, api_key, entities):
+    """Search for one claim; returns the results or None when there are none"""
+    search_results = search_google(claim, api_key, entities)
+    if not search_results or 'organic_results' not in search_results:
+        return None
+    return search_results
+
+def verify_article(text, api_key, max_workers=None, time_budget=None, progress=None):
+    """Extract claims from an article and verify them concurrently
+
+    All claim searches start at once (at most max_workers in flight).
+    Whenever searches finish, every claim whose results are in is verified
+    in one batched embedding pass. The article is Fake as soon as any claim
+    comes back Fake, at which point outstanding searches are cancelled.
+    Claims still pending when the time budget runs out are reported as
+    timed out and the article is Fake. Verified claims carry the verdict
+    reason and per-snippet evidence; claims matching a recently verified one
+    in the claim store take its verdict without a search and carry the
+    match under `stored` instead.
+
+    progress, if given, is called with the partial report once the claims
+    are extracted and again whenever claims are resolved.
+    """
+    max_workers = max_workers or MAX_CONCURRENT_SEARCHES
+    time_budget = ARTICLE_TIME_BUDGET if time_budget is None else time_budget
+    start = time.perf_counter()
+
+    analysis = analyze_text(text)
+    entities = analysis['entities']
+    claims = analysis['claims']
+    report = {
+        'text': text,
+        'entities': entities,
+        'claims': [{'claim': claim, 'verdict': None, 'status': 'pending'} for claim in claims],
+        'verdict': "Real",
+        'timed_out': False
+    }
 
-        cosine_scores = util.cos_sim(claim_embedding, snippet_embeddings)[0]
+    if progress is not None:
+        progress(report)
+
+    embedding_service = get_embedding_service()
+    if not claims or embedding_service is None:
+        report['verdict'] = "Fake"
+        report['elapsed'] = time.perf_counter() - start
+        return report
+
+    # Claims close enough to recently verified ones take the stored verdict and aren't searched
+    claim_store = get_claim_store()
+    if claim_store is not None:
+        with timed('claim_store', len(claims)):
+            matches = claim_store.lookup(embedding_service.encode(claims))
+        for entry, match in zip(report['claims'], matches):
+            if match is not None:
+                entry.update(verdict=match['verdict'], status="verified", reason=match['reason'], stored=match)
+        if any(entry['verdict'] == "Fake" for entry in report['claims']):
+            report['verdict'] = "Fake"
+
+    # A stored Fake verdict already decides the article: nothing is searched
+    # and the claims left pending are reported as cancelled
+    to_search = [] if report['verdict'] == "Fake" else [
+        i for i, entry in enumerate(report['claims']) if entry['status'] == 'pending'
+    ]
 
-        for i, snippet_info in enumerate(snippets_to_analyze):
-            snippet_text = snippet_info['text']
-            link = snippet_info['link']
-            similarity_score = cosine_scores[i].item()
-            
-            print(f"        Analyzing search result {i+1} from {link}: Similarity={similarity_score:.4f}")
-            print(f"          Snippet: {snippet_text[:150]}...")
-            
-            parsed_url = urlparse(link)
-            domain = parsed_url.netloc
-            is_reliable_source = any(rd in domain for rd in reliable_domains)
-            print(f"          Extracted domain: {domain}, Is reliable source: {is_reliable_source}")
-
-            # NEW: More nuanced confirmation if a source is generally trustworthy but not in our explicit list
-            is_generally_trustworthy = is_reliable_source or ("news" in domain or "report" in domain or "press" in domain)
-
-            if similarity_score >= similarity_threshold and is_generally_trustworthy:
-                if any(neg_word in snippet_text.lower() for neg_word in ["not", "false", "incorrect", "no evidence", "denied", "refuted", "rumor", "hoax"]):
-                    print(f"          *** POTENTIAL CONTRADICTION within a highly similar, trustworthy snippet. ***")
-                    contradicting_snippets_count += 1
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(to_search))))
+    pending = {executor.submit(_search_claim, claims[i], api_key, entities): i for i in to_search}
+    try:
+        while pending and report['verdict'] != "Fake":
+            remaining = time_budget - (time.perf_counter() - start)
+            done, _ = wait(pending, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+            if not done:
+                report['timed_out'] = True
+                report['verdict'] = "Fake"
+                break
+
+            to_verify = []
+            for future in done:
+                i = pending.pop(future)
+                entry = report['claims'][i]
+                try:
+                    search_results = future.result()
+                except Exception as e:
+                    entry['verdict'], entry['status'] = "Fake", f"error: {e}"
+                    continue
+                if search_results is None:
+                    # No search results implies unverified/fake
+                    entry['verdict'], entry['status'] = "Fake", "no_results"
                 else:
-                    print(f"          *** STRONG CONFIRMATION FOUND from trustworthy source! ***")
-                    confirming_snippets_count += 1
-            elif similarity_score > 0.4 and any(neg_word in snippet_text.lower() for neg_word in ["not", "false", "incorrect", "denied", "refuted", "rumor", "hoax"]) and is_generally_trustworthy:
-                print(f"          *** EXPLICIT CONTRADICTION FOUND from a trustworthy source! ***")
-                contradicting_snippets_count += 1
-            else:
-                print(f"          No strong confirmation or contradiction from this snippet (Sim: {similarity_score:.2f}, Reliable: {is_reliable_source}, Trustworthy: {is_generally_trustworthy}).")
-
-    print(f"    Summary: Confirmations: {confirming_snippets_count}, Contradictions: {contradicting_snippets_count}")
-
-    # Final Verdict Logic - Highly tuned for high confidence 'Real' detection
-    if confirming_snippets_count > contradicting_snippets_count and confirming_snippets_count > 0:
-        # Ensure a strong positive signal
-        if confirming_snippets_count >= 2: # At least two strong confirmations
-            print("    VERDICT LOGIC: Multiple strong confirmations, minimal contradictions. => Real")
-            return "Real"
-        elif confirming_snippets_count == 1 and contradicting_snippets_count == 0 and similarity_threshold > 0.6: # Single strong confirmation if similarity is very high
-            print("    VERDICT LOGIC: Single very strong confirmation, no contradictions. => Real")
-            return "Real"
-        else:
-            print("    VERDICT LOGIC: Some confirmations, but not strong enough for 'Real'. => Fake (conservative)")
-            return "Fake"
-    elif contradicting_snippets_count > 0:
-        print("    VERDICT LOGIC: Found contradictions. => Fake")
-        return "Fake"
-    else:
-        print("    VERDICT LOGIC: No strong confirmations or clear dominance of either. Defaulting to Fake.")
-        return "Fake" # Default to Fake (conservative)
+                    to_verify.append((i, search_results))
+
+            if to_verify:
+                verified = verify_claims([(claims[i], results) for i, results in to_verify],
+                                         embedding_service, return_evidence=True)
+                for (i, _), result in zip(to_verify, verified):
+                    report['claims'][i].update(
+                        verdict=result['verdict'], status="verified",
+                        reason=result['reason'], evidence=result['evidence']
+                    )
+                if claim_store is not None:
+                    # Verdicts without any confirming or contradicting evidence aren't worth keeping
+                    keep = [(claims[i], result) for (i, _), result in zip(to_verify, verified)
+                            if result['confirmations'] or result['contradictions']]
+                    if keep:
+                        kept_claims = [claim for claim, _ in keep]
+                        claim_store.put(kept_claims, embedding_service.encode(kept_claims),
+                                        [result for _, result in keep])
+
+            if any(entry['verdict'] == "Fake" for entry in report['claims']):
+                report['verdict'] = "Fake"  # If any claim is fake, the whole news is fake
+            if progress is not None:
+                progress(report)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    for entry in report['claims']:
+        if entry['status'] == 'pending':
+            entry['status'] = 'timed_out' if report['timed_out'] else 'cancelled'
+
+    report['elapsed'] = time.perf_counter() - start
+    return report
+
+def print_report(report):
+    """Print the outcome of verify_article()"""
+    print(f"  Entities: {report['entities']}")
+    for entry in report['claims']:
+        print(f"    Claim: '{entry['claim']}' -> {entry['verdict'] or '-'} ({entry['status']})")
+    if report['timed_out']:
+        print("  Time budget exceeded before all claims were verified.")
+    print(f"\nFINAL NEWS VERDICT: {report['verdict']} ({report['elapsed']:.2f}s)")
+
+def extract_file(path, batch_size=64, n_process=1):
+    """Write claims for every article in a JSONL/CSV file as NDJSON on stdout"""
+    import sys
+    import json
+    from collections import deque
+    from predict_simple import read_records
+
+    fmt = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+    start = time.perf_counter()
+    count = 0
+    ids = deque()
+
+    def texts(records):
+        for record_id, text in records:
+            ids.append(record_id)
+            yield text if isinstance(text, str) else ''
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for analysis in analyze_texts(texts(read_records(f, fmt)), batch_size, n_process):
+            sys.stdout.write(json.dumps(dict(analysis, id=ids.popleft())) + "\n")
+            count += 1
+    elapsed = time.perf_counter() - start
+    print(f"Parsed {count} articles in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.1f} articles/sec)", file=sys.stderr)
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Claim extraction and web verification")
+    parser.add_argument("--extract", metavar="PATH", help="extract claims from a JSONL/CSV file (no web search)")
+    parser.add_argument("--batch-size", type=int, default=64, help="spaCy nlp.pipe batch size for --extract")
+    parser.add_argument("--n-process", type=int, default=1, help="spaCy parsing processes for --extract")
+    parser.add_argument("--startup-report", action="store_true", help="print cold-start time and memory, then exit")
+    args = parser.parse_args()
+    configure_logging()
+
+    if args.startup_report:
+        print(f"After import: {startup_report()}")
+        print(f"After warmup: {warmup()}")
+        raise SystemExit(0)
+
+    if args.extract:
+        extract_file(args.extract, args.batch_size, args.n_process)
+        raise SystemExit(0)
+
     # Try to get API key from environment variable or prompt user
     SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY")
-    if not SERPAPI_API_KEY:
+    if EVIDENCE_BACKEND == "local":
+        print(f"\nSearching the local evidence index ({EVIDENCE_INDEX_PATH}).")
+    elif not SERPAPI_API_KEY and get_search_cache().mode == 'offline':
+        print("\nOffline mode: serving cached search results only.")
+    elif not SERPAPI_API_KEY:
         print("\n--- SerpApi API Key Required ---")
         print("Please get your API key from https://serpapi.com/ and set it as an environment variable (SERPAPI_API_KEY) or enter it here for this session.")
         SERPAPI_API_KEY = input("Enter your SerpApi API Key: ")
@@ -203,84 +665,15 @@ if __name__ == "__main__":
             exit()
 
     print("\n--- Testing Claim Extractor ---")
-    sample_news_1 = "Indian prime minister is Narendra Modi. He visited France last week."
-    sample_news_2 = "The Earth is flat and the moon is made of cheese. Scientists confirm this today."
-    sample_news_3 = "India's prime minister is Vijay Prasath."
-
-    print(f"\nAnalyzing: '{sample_news_1}'")
-    entities_1 = extract_entities(sample_news_1)
-    claims_1 = extract_claims(sample_news_1)
-    print(f"  Entities: {entities_1}")
-    print(f"  Claims: {claims_1}")
-
-    if claims_1 and model_st:
-        print("  Performing web searches for claims...")
-        for i, claim in enumerate(claims_1):
-            print(f"    Searching for Claim {i+1}: '{claim}'")
-            search_results = search_google(claim, SERPAPI_API_KEY, entities_1)
-            if search_results and 'organic_results' in search_results:
-                print(f"      Top 3 search results for '{claim}':")
-                for j, result in enumerate(search_results['organic_results'][:3]):
-                    title = result.get('title', 'N/A')
-                    snippet = result.get('snippet', 'N/A')
-                    link = result.get('link', 'N/A')
-                    print(f"        {j+1}. {title} - {snippet[:100]}... ({link})")
-                verdict = verify_claim_with_results(claim, search_results, semantic_model=model_st)
-                print(f"      Verdict for '{claim}': {verdict}")
-            else:
-                print(f"      No significant search results found for '{claim}'.")
-    else:
-        print("  No claims extracted or semantic model not loaded for sample 1.")
-
-    print(f"\nAnalyzing: '{sample_news_2}'")
-    entities_2 = extract_entities(sample_news_2)
-    claims_2 = extract_claims(sample_news_2)
-    print(f"  Entities: {entities_2}")
-    print(f"  Claims: {claims_2}")
-
-    if claims_2 and model_st:
-        print("  Performing web searches for claims...")
-        for i, claim in enumerate(claims_2):
-            print(f"    Searching for Claim {i+1}: '{claim}'")
-            search_results = search_google(claim, SERPAPI_API_KEY, entities_2)
-            if search_results and 'organic_results' in search_results:
-                print(f"      Top 3 search results for '{claim}':")
-                for j, result in enumerate(search_results['organic_results'][:3]):
-                    title = result.get('title', 'N/A')
-                    snippet = result.get('snippet', 'N/A')
-                    link = result.get('link', 'N/A')
-                    print(f"        {j+1}. {title} - {snippet[:100]}... ({link})")
-                verdict = verify_claim_with_results(claim, search_results, semantic_model=model_st)
-                print(f"      Verdict for '{claim}': {verdict}")
-            else:
-                print(f"      No significant search results found for '{claim}'.")
-    else:
-        print("  No claims extracted or semantic model not loaded for sample 2.")
-
-    print(f"\nAnalyzing: '{sample_news_3}'")
-    entities_3 = extract_entities(sample_news_3)
-    claims_3 = extract_claims(sample_news_3)
-    print(f"  Entities: {entities_3}")
-    print(f"  Claims: {claims_3}")
-
-    if claims_3 and model_st:
-        print("  Performing web searches for claims...")
-        for i, claim in enumerate(claims_3):
-            print(f"    Searching for Claim {i+1}: '{claim}'")
-            search_results = search_google(claim, SERPAPI_API_KEY, entities_3)
-            if search_results and 'organic_results' in search_results:
-                print(f"      Top 3 search results for '{claim}':")
-                for j, result in enumerate(search_results['organic_results'][:3]):
-                    title = result.get('title', 'N/A')
-                    snippet = result.get('snippet', 'N/A')
-                    link = result.get('link', 'N/A')
-                    print(f"        {j+1}. {title} - {snippet[:100]}... ({link})")
-                verdict = verify_claim_with_results(claim, search_results, semantic_model=model_st)
-                print(f"      Verdict for '{claim}': {verdict}")
-            else:
-                print(f"      No significant search results found for '{claim}'.")
-    else:
-        print("  No claims extracted or semantic model not loaded for sample 3.")
+    sample_news = [
+        "Indian prime minister is Narendra Modi. He visited France last week.",
+        "The Earth is flat and the moon is made of cheese. Scientists confirm this today.",
+        "India's prime minister is Vijay Prasath.",
+    ]
+
+    for sample in sample_news:
+        print(f"\nAnalyzing: '{sample}'")
+        print_report(verify_article(sample, SERPAPI_API_KEY))
 
     print("\n--- Test Claim Extractor with your own text (with Web Search) ---")
     while True:
@@ -288,38 +681,10 @@ if __name__ == "__main__":
         if user_text.lower() == 'exit':
             break
         if user_text:
-            entities = extract_entities(user_text)
-            claims = extract_claims(user_text)
-            print(f"  Entities: {entities}")
-            print(f"  Claims: {claims}")
-
-            if claims and model_st:
-                print("  Performing web searches for claims...")
-                final_news_verdict = "Real" # Default to real, change to fake if any claim is fake
-                for i, claim in enumerate(claims):
-                    print(f"    Searching for Claim {i+1}: '{claim}'")
-                    search_results = search_google(claim, SERPAPI_API_KEY, entities)
-                    if search_results and 'organic_results' in search_results:
-                        print(f"      Top 3 search results for '{claim}':")
-                        for j, result in enumerate(search_results['organic_results'][:3]):
-                            title = result.get('title', 'N/A')
-                            snippet = result.get('snippet', 'N/A')
-                            link = result.get('link', 'N/A')
-                            print(f"        {j+1}. {title} - {snippet[:100]}... ({link})")
-                        verdict = verify_claim_with_results(claim, search_results, semantic_model=model_st)
-                        print(f"      Verdict for '{claim}': {verdict}")
-                        if verdict == "Fake":
-                            final_news_verdict = "Fake"
-                            break # If any claim is fake, the whole news is fake
-                    else:
-                        print(f"      No significant search results found for '{claim}'.")
-                        final_news_verdict = "Fake" # No search results implies unverified/fake
-                print(f"\nFINAL NEWS VERDICT: {final_news_verdict}")
-            else:
-                print("  No claims extracted or semantic model not loaded. Defaulting to Fake.")
-                print(f"\nFINAL NEWS VERDICT: Fake")
-
+            print_report(verify_article(user_text, SERPAPI_API_KEY))
         else:
             print("Please enter some text.")
 
+    if _embedding_service is not None:
+        print(f"Embedding stats: {_embedding_service.stats()}")
     print("Exiting claim extractor.")
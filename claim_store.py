@@ -0,0 +1,227 @@
+"""
+Persistent store of verified claims with approximate nearest-neighbour lookup
+
+The same claims ("India's prime minister is ...") turn up in article after
+article. ClaimStore keeps every verified claim with its embedding, verdict,
+reason, supporting links and verification time in SQLite, so a claim
+that means the same as a recently verified one can reuse its verdict
+without searching the web again.
+
+Lookups use random-hyperplane LSH: each embedding gets one `bits`-bit
+signature per table, and a query reads the rows in its own bucket and the
+buckets one bit away, in every table. Only those candidates are compared
+by cosine similarity, so a lookup reads a few hundred rows even when
+millions of claims are stored. Entries expire after `ttl` seconds.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+class ClaimStore:
+    """SQLite store of verified claims, looked up by embedding similarity"""
+
+    def __init__(self, path='claim_store.db', model_name='all-MiniLM-L6-v2', threshold=0.92,
+                 ttl=30 * 86400, tables=8, bits=18, seed=0):
+        self.path = path
+        self.model_name = model_name
+        self.threshold = threshold
+        self.ttl = ttl
+        self.tables = tables
+        self.bits = bits
+        self.seed = seed
+        self._planes = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats_counters = {'lookups': 0, 'hits': 0, 'stored': 0}
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS claims ('
+                'id INTEGER PRIMARY KEY, claim TEXT NOT NULL UNIQUE, verdict TEXT NOT NULL, reason TEXT, '
+                'links TEXT, vector BLOB NOT NULL, verified_at REAL NOT NULL, expires_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_claims_expires ON claims (expires_at)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'table_no INTEGER NOT NULL, bucket INTEGER NOT NULL, claim_id INTEGER NOT NULL, '
+                'PRIMARY KEY (table_no, bucket, claim_id)) WITHOUT ROWID'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_buckets_claim ON buckets (claim_id)')
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            layout = json.dumps({'model': model_name, 'tables': tables, 'bits': bits, 'seed': seed})
+            conn.execute('INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)', ('layout', layout))
+            stored = conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()[0]
+        if json.loads(stored) != json.loads(layout):
+            raise ValueError(f"{path} was built with {stored}, not {layout}; use another path")
+
+    def _connect(self):
+        """One connection per thread, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _signatures(self, vectors):
+        """(n, tables) bucket numbers of unit vectors"""
+        if self._planes is None or self._planes.shape[1] != vectors.shape[1]:
+            rng = np.random.default_rng(self.seed)
+            self._planes = rng.standard_normal((self.tables * self.bits, vectors.shape[1])).astype(np.float32)
+        signs = (vectors @ self._planes.T > 0).reshape(len(vectors), self.tables, self.bits)
+        return signs.astype(np.int64) @ (1 << np.arange(self.bits, dtype=np.int64))
+
+    @staticmethod
+    def _normalize(vectors):
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    def _candidates(self, conn, signature):
+        """IDs of the claims in the query's buckets or one bit away from them"""
+        flips = [0] + [1 << bit for bit in range(self.bits)]
+        placeholders = ','.join('?' * len(flips))
+        ids = set()
+        for table_no, bucket in enumerate(signature.tolist()):
+            rows = conn.execute(
+                f'SELECT claim_id FROM buckets WHERE table_no = ? AND bucket IN ({placeholders})',
+                [table_no] + [bucket ^ flip for flip in flips]
+            ).fetchall()
+            ids.update(row[0] for row in rows)
+        return ids
+
+    def lookup(self, vectors, max_age=None):
+        """The best unexpired match above the threshold for each embedding, or None
+
+        A match is a dict with the stored claim, verdict, reason, links,
+        verified_at and the cosine similarity. max_age (seconds) can ask for
+        fresher verdicts than the store's ttl.
+        """
+        vectors = self._normalize(vectors)
+        now = time.time()
+        oldest = now - max_age if max_age is not None else 0.0
+        conn = self._connect()
+        matches = []
+        for vector, signature in zip(vectors, self._signatures(vectors)):
+            ids = list(self._candidates(conn, signature))
+            best, best_similarity = None, self.threshold
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT claim, verdict, reason, links, verified_at, vector FROM claims "
+                    f"WHERE id IN ({','.join('?' * len(chunk))}) AND expires_at > ? AND verified_at >= ?",
+                    chunk + [now, oldest]
+                ).fetchall()
+                if not rows:
+                    continue
+                similarities = np.vstack([np.frombuffer(row[5], dtype=np.float16) for row in rows]) @ vector
+                k = int(np.argmax(similarities))
+                if similarities[k] >= best_similarity:
+                    best, best_similarity = rows[k], float(similarities[k])
+            if best is None:
+                matches.append(None)
+            else:
+                claim, verdict, reason, links, verified_at, _ = best
+                matches.append({'claim': claim, 'verdict': verdict, 'reason': reason,
+                                'links': json.loads(links) if links else [], 'verified_at': verified_at,
+                                'similarity': round(best_similarity, 4)})
+        with self._lock:
+            self.stats_counters['lookups'] += len(matches)
+            self.stats_counters['hits'] += sum(match is not None for match in matches)
+        return matches
+
+    def put(self, claims, vectors, results):
+        """Store verified claims with their embeddings and verify_claims() results
+
+        A claim that is already stored is replaced. Expired claims are
+        purged as a side effect.
+        """
+        vectors = self._normalize(vectors)
+        signatures = self._signatures(vectors)
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            for claim, vector, signature, result in zip(claims, vectors, signatures, results):
+                links = [item['link'] for item in result.get('evidence', []) if item['outcome'] != 'neutral']
+                old = conn.execute('SELECT id FROM claims WHERE claim = ?', (claim,)).fetchone()
+                if old is not None:
+                    conn.execute('DELETE FROM buckets WHERE claim_id = ?', old)
+                    conn.execute('DELETE FROM claims WHERE id = ?', old)
+                claim_id = conn.execute(
+                    'INSERT INTO claims (claim, verdict, reason, links, vector, verified_at, expires_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (claim, result['verdict'], result.get('reason'), json.dumps(links),
+                     vector.astype(np.float16).tobytes(), now, now + self.ttl)
+                ).lastrowid
+                conn.executemany('INSERT INTO buckets (table_no, bucket, claim_id) VALUES (?, ?, ?)',
+                                 [(table_no, bucket, claim_id) for table_no, bucket in enumerate(signature.tolist())])
+            self._purge(conn, now)
+        with self._lock:
+            self.stats_counters['stored'] += len(claims)
+
+    def _purge(self, conn, now):
+        conn.execute('DELETE FROM buckets WHERE claim_id IN (SELECT id FROM claims WHERE expires_at <= ?)', (now,))
+        return conn.execute('DELETE FROM claims WHERE expires_at <= ?', (now,)).rowcount
+
+    def purge(self):
+        """Delete expired claims; returns how many were removed"""
+        conn = self._connect()
+        with conn:
+            return self._purge(conn, time.time())
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.stats_counters)
+        stats['hit_rate'] = round(stats['hits'] / stats['lookups'], 4) if stats['lookups'] else 0.0
+        stats['claims'] = self._connect().execute('SELECT COUNT(*) FROM claims').fetchone()[0]
+        stats['threshold'] = self.threshold
+        stats['ttl'] = self.ttl
+        return stats
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark claim store lookups on random embeddings')
+    parser.add_argument('--path', default='claim_store_bench.db')
+    parser.add_argument('--claims', type=int, default=100000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    # Queries are noisy copies of stored embeddings (cosine ~0.95 to the original)
+    rng = np.random.default_rng(0)
+    store = ClaimStore(args.path, model_name='benchmark')
+    stored = store.stats()['claims']
+    if stored < args.claims:
+        start = time.perf_counter()
+        for offset in range(stored, args.claims, 10000):
+            count = min(10000, args.claims - offset)
+            vectors = np.random.default_rng(offset + 1).standard_normal((count, args.dim)).astype(np.float32)
+            store.put([f'claim {offset + i}' for i in range(count)], vectors,
+                      [{'verdict': 'Real', 'reason': 'benchmark'}] * count)
+        print(f"Stored {args.claims - stored} claims in {time.perf_counter() - start:.1f}s")
+
+    ids = rng.integers(0, args.claims, size=args.queries)
+    conn = store._connect()
+    originals = np.vstack([
+        np.frombuffer(conn.execute('SELECT vector FROM claims WHERE claim = ?', (f'claim {i}',)).fetchone()[0],
+                      dtype=np.float16).astype(np.float32)
+        for i in ids
+    ])
+    queries = store._normalize(originals) + rng.standard_normal(originals.shape).astype(np.float32) * 0.33 / np.sqrt(args.dim)
+
+    start = time.perf_counter()
+    matches = [store.lookup(query)[0] for query in queries]
+    elapsed = time.perf_counter() - start
+    found = sum(match is not None and match['claim'] == f'claim {i}' for match, i in zip(matches, ids))
+    print(f"{args.queries} lookups over {args.claims} claims: {elapsed / args.queries * 1000:.2f} ms each, "
+          f"{found}/{args.queries} found")
+    print(store.stats())
@@ -0,0 +1,142 @@
+"""
+Batched, cached sentence embeddings
+
+EmbeddingService wraps a SentenceTransformer so that callers encode all the
+texts they need (claims and snippets) in one forward pass. Texts are
+deduplicated by hash and looked up in an in-memory LRU and an optional
+on-disk SQLite cache before anything is sent to the model.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from metrics import CACHE_LOOKUPS
+
+class EmbeddingService:
+    """Encode texts with deduplication, LRU/disk caching and throughput stats"""
+
+    def __init__(self, model, model_name='all-MiniLM-L6-v2', cache_size=50000,
+                 cache_path=None, num_threads=None, batch_size=64):
+        self.model = model
+        self.model_name = model_name
+        self.cache_size = cache_size
+        self.cache_path = cache_path
+        self.batch_size = batch_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats_counters = {
+            'requested': 0, 'memory_hits': 0, 'disk_hits': 0,
+            'encoded': 0, 'forward_passes': 0, 'encode_seconds': 0.0
+        }
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+        if cache_path:
+            with self._connect() as conn:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS embeddings ('
+                    'key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL)'
+                )
+
+    def _connect(self):
+        """One connection per thread, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.cache_path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.cache_path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode('utf-8')).hexdigest()
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.cache_size:
+                self._memory.popitem(last=False)
+
+    def _count(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self.stats_counters[name] += amount
+
+    def encode(self, texts):
+        """Return a float32 array with one embedding row per text"""
+        texts = list(texts)
+        keys = [self._key(text) for text in texts]
+        found = {}
+
+        with self._lock:
+            for key in set(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+        memory_hits = len(found)
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        disk_hits = 0
+        if missing and self.cache_path:
+            conn = self._connect()
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f'SELECT key, vector FROM embeddings WHERE key IN ({placeholders})', chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    found[key] = vector
+                    self._remember(key, vector)
+                    disk_hits += 1
+            missing = [key for key in missing if key not in found]
+
+        if missing:
+            text_for = dict(zip(keys, texts))
+            start = time.perf_counter()
+            vectors = self.model.encode(
+                [text_for[key] for key in missing],
+                batch_size=self.batch_size,
+                convert_to_numpy=True
+            ).astype(np.float32)
+            elapsed = time.perf_counter() - start
+            for key, vector in zip(missing, vectors):
+                found[key] = vector
+                self._remember(key, vector)
+            if self.cache_path:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)',
+                        [(key, len(found[key]), found[key].tobytes()) for key in missing]
+                    )
+            self._count(encoded=len(missing), forward_passes=1, encode_seconds=elapsed)
+
+        self._count(requested=len(texts), memory_hits=memory_hits, disk_hits=disk_hits)
+        CACHE_LOOKUPS.inc(memory_hits, cache='embedding', result='memory_hit')
+        CACHE_LOOKUPS.inc(disk_hits, cache='embedding', result='disk_hit')
+        CACHE_LOOKUPS.inc(len(missing), cache='embedding', result='miss')
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([found[key] for key in keys])
+
+    def stats(self):
+        """Cache hit counts and model throughput (embeddings per second)"""
+        with self._lock:
+            stats = dict(self.stats_counters)
+            stats['memory_cache_size'] = len(self._memory)
+        seconds = stats['encode_seconds']
+        stats['embeddings_per_second'] = round(stats['encoded'] / seconds, 1) if seconds else 0.0
+        stats['encode_seconds'] = round(seconds, 3)
+        return stats
@@ -0,0 +1,330 @@
+"""
+Local evidence search: BM25 over an SQLite inverted index, plus embeddings
+
+An offline stand-in for SerpApi. Trusted articles are split into passages
+of about PASSAGE_WORDS words and stored in one SQLite file:
+
+  passages  - link, title, text, length in terms and an optional embedding
+  postings  - term -> passage with its term frequency
+  terms     - document frequency of each term
+
+search() ranks passages by BM25 and, when the index was given an embedding
+function, by cosine similarity as well, merging the two rankings with
+reciprocal rank fusion. Results come back in SerpApi's shape
+({'organic_results': [{'title', 'snippet', 'link'}]}), so claim
+verification works the same with either backend. Adding an article that is
+already indexed replaces its passages.
+
+    python evidence_index.py add trusted_articles.jsonl
+    python evidence_index.py search "India's prime minister is Narendra Modi"
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PASSAGE_WORDS = 60
+RRF_K = 60
+# Query terms in more than this share of passages are skipped when rarer ones
+# exist: their postings are long and their BM25 weight is close to zero
+MAX_DF_RATIO = 0.1
+STOPWORDS = frozenset(
+    "a an and are as at be been by for from had has have he her his i in is it its of on or "
+    "she that the their they this to was we were which will with".split()
+)
+_TOKEN_RE = re.compile(r'\w+')
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+def tokenize(text):
+    """Lowercased word tokens without stopwords"""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+def split_passages(text, max_words=PASSAGE_WORDS):
+    """Group consecutive sentences into passages of at most max_words words"""
+    passages, current, length = [], [], 0
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        words = len(sentence.split())
+        if current and length + words > max_words:
+            passages.append(' '.join(current))
+            current, length = [], 0
+        current.append(sentence)
+        length += words
+    if current:
+        passages.append(' '.join(current))
+    return passages
+
+class EvidenceIndex:
+    """BM25 + vector search over passages of trusted articles, stored in SQLite"""
+
+    def __init__(self, path='evidence_index.db', embed=None, k1=1.2, b=0.75):
+        self.path = path
+        self.embed = embed  # texts -> array of embeddings, or None for BM25 only
+        self.k1 = k1
+        self.b = b
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._vectors = (None, None, None)  # (generation, passage ids, normalized matrix)
+        self._lengths_cache = (None, None)  # (generation, passage lengths by id)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS passages ('
+                'id INTEGER PRIMARY KEY, link TEXT NOT NULL, title TEXT, text TEXT NOT NULL, '
+                'length INTEGER NOT NULL, vector BLOB)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_passages_link ON passages (link)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS postings ('
+                'term TEXT NOT NULL, passage_id INTEGER NOT NULL, tf INTEGER NOT NULL, '
+                'PRIMARY KEY (term, passage_id)) WITHOUT ROWID'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_postings_passage ON postings (passage_id)')
+            conn.execute('CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER NOT NULL) WITHOUT ROWID')
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            conn.executemany('INSERT OR IGNORE INTO meta (key, value) VALUES (?, 0)',
+                             [('passages',), ('total_length',), ('generation',)])
+
+    def _connect(self):
+        """One connection per thread, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _meta(self, conn):
+        return dict(conn.execute('SELECT key, value FROM meta').fetchall())
+
+    def _remove(self, conn, link):
+        """Delete an article's passages, postings and document frequencies"""
+        rows = conn.execute('SELECT id, length FROM passages WHERE link = ?', (link,)).fetchall()
+        for passage_id, _ in rows:
+            conn.execute('UPDATE terms SET df = df - 1 WHERE term IN '
+                         '(SELECT term FROM postings WHERE passage_id = ?)', (passage_id,))
+            conn.execute('DELETE FROM postings WHERE passage_id = ?', (passage_id,))
+        if rows:
+            conn.execute('DELETE FROM terms WHERE df <= 0')
+            conn.execute('DELETE FROM passages WHERE link = ?', (link,))
+            conn.execute("UPDATE meta SET value = value - ? WHERE key = 'passages'", (len(rows),))
+            conn.execute("UPDATE meta SET value = value - ? WHERE key = 'total_length'",
+                         (sum(length for _, length in rows),))
+        return len(rows)
+
+    def add(self, articles, vectors=True):
+        """Index (or re-index) articles given as dicts with link, title and text
+
+        Returns the number of passages written. Embeddings are computed only
+        when the index has an embedding function and vectors is true.
+        """
+        written = 0
+        conn = self._connect()
+        for article in articles:
+            link = article.get('link') or article.get('url')
+            text = article.get('text') or ''
+            if not link or not text.strip():
+                continue
+            passages = split_passages(text)
+            embeddings = [None] * len(passages)
+            if vectors and self.embed is not None:
+                matrix = np.asarray(self.embed(passages), dtype=np.float32)
+                matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+                embeddings = [row.tobytes() for row in matrix]
+            with conn:
+                self._remove(conn, link)
+                total_length = 0
+                for passage, embedding in zip(passages, embeddings):
+                    counts = Counter(tokenize(passage))
+                    length = sum(counts.values())
+                    total_length += length
+                    passage_id = conn.execute(
+                        'INSERT INTO passages (link, title, text, length, vector) VALUES (?, ?, ?, ?, ?)',
+                        (link, article.get('title'), passage, length, embedding)
+                    ).lastrowid
+                    conn.executemany('INSERT INTO postings (term, passage_id, tf) VALUES (?, ?, ?)',
+                                     [(term, passage_id, tf) for term, tf in counts.items()])
+                    conn.executemany('INSERT INTO terms (term, df) VALUES (?, 1) '
+                                     'ON CONFLICT (term) DO UPDATE SET df = df + 1',
+                                     [(term,) for term in counts])
+                conn.execute("UPDATE meta SET value = value + ? WHERE key = 'passages'", (len(passages),))
+                conn.execute("UPDATE meta SET value = value + ? WHERE key = 'total_length'", (total_length,))
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+            written += len(passages)
+        return written
+
+    def remove(self, link):
+        """Drop an article from the index; returns the number of passages removed"""
+        conn = self._connect()
+        with conn:
+            removed = self._remove(conn, link)
+            if removed:
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+        return removed
+
+    def _lengths(self, conn, generation):
+        """Passage lengths indexed by passage id, reloaded after the index changes"""
+        with self._lock:
+            cached_generation, lengths = self._lengths_cache
+            if cached_generation != generation:
+                rows = np.array(conn.execute('SELECT id, length FROM passages').fetchall(), dtype=np.int64).reshape(-1, 2)
+                lengths = np.zeros(rows[:, 0].max() + 1 if len(rows) else 0)
+                lengths[rows[:, 0]] = rows[:, 1]
+                self._lengths_cache = (generation, lengths)
+            return lengths
+
+    def _bm25(self, conn, terms, meta, limit):
+        """(passage ids, scores) of the best BM25 matches, best first"""
+        passages = meta['passages']
+        placeholders = ','.join('?' * len(terms))
+        df = dict(conn.execute(f'SELECT term, df FROM terms WHERE term IN ({placeholders})', terms).fetchall())
+        if not df:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        rare = {term: n for term, n in df.items() if n <= passages * MAX_DF_RATIO}
+        df = rare or df
+
+        lengths = self._lengths(conn, meta['generation'])
+        average = meta['total_length'] / passages
+        ids, contributions = [], []
+        for term, n in df.items():
+            # Postings are clustered by term (WITHOUT ROWID), so this is one range scan
+            postings = np.array(conn.execute('SELECT passage_id, tf FROM postings WHERE term = ?', (term,)).fetchall(),
+                                dtype=np.int64).reshape(-1, 2)
+            tf = postings[:, 1].astype(np.float64)
+            norm = self.k1 * (1 - self.b + self.b * lengths[postings[:, 0]] / average)
+            idf = math.log(1 + (passages - n + 0.5) / (n + 0.5))
+            ids.append(postings[:, 0])
+            contributions.append(idf * tf * (self.k1 + 1) / (tf + norm))
+        unique_ids, owner = np.unique(np.concatenate(ids), return_inverse=True)
+        scores = np.bincount(owner, weights=np.concatenate(contributions))
+        count = min(limit, len(scores))
+        top = np.argpartition(-scores, count - 1)[:count]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return unique_ids[top], scores[top]
+
+    def _matrix(self, conn, generation):
+        """Passage ids and normalized embeddings, reloaded after the index changes"""
+        with self._lock:
+            cached_generation, ids, matrix = self._vectors
+            if cached_generation == generation:
+                return ids, matrix
+            rows = conn.execute('SELECT id, vector FROM passages WHERE vector IS NOT NULL').fetchall()
+            ids = np.array([row[0] for row in rows], dtype=np.int64)
+            matrix = np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows]) if rows else None
+            self._vectors = (generation, ids, matrix)
+            return ids, matrix
+
+    def _nearest(self, conn, query, generation, limit):
+        ids, matrix = self._matrix(conn, generation)
+        if matrix is None:
+            return np.zeros(0, dtype=np.int64)
+        vector = np.asarray(self.embed([query]), dtype=np.float32)[0]
+        similarities = matrix @ (vector / max(float(np.linalg.norm(vector)), 1e-12))
+        count = min(limit, len(ids))
+        top = np.argpartition(-similarities, count - 1)[:count]
+        return ids[top[np.argsort(-similarities[top], kind='stable')]]
+
+    def search(self, query, num_results=5, candidates=100):
+        """SerpApi-shaped results for the passages best matching query ({} when none match)"""
+        conn = self._connect()
+        meta = self._meta(conn)
+        if not meta['passages']:
+            return {}
+        terms = sorted(set(tokenize(query)))
+        rankings = []
+        if terms:
+            bm25_ids, _ = self._bm25(conn, terms, meta, candidates)
+            rankings.append(bm25_ids)
+        if self.embed is not None:
+            rankings.append(self._nearest(conn, query, meta['generation'], candidates))
+
+        fused = {}
+        for ranking in rankings:
+            for rank, passage_id in enumerate(ranking.tolist()):
+                fused[passage_id] = fused.get(passage_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        best = sorted(fused, key=fused.get, reverse=True)[:num_results]
+        if not best:
+            return {}
+
+        placeholders = ','.join('?' * len(best))
+        rows = {row[0]: row[1:] for row in conn.execute(
+            f'SELECT id, link, title, text FROM passages WHERE id IN ({placeholders})', best
+        ).fetchall()}
+        results = []
+        for passage_id in best:
+            link, title, text = rows[passage_id]
+            results.append({'position': len(results) + 1, 'title': title or link, 'link': link, 'snippet': text})
+        return {'organic_results': results}
+
+    def stats(self):
+        conn = self._connect()
+        meta = self._meta(conn)
+        return {
+            'path': self.path,
+            'articles': conn.execute('SELECT COUNT(DISTINCT link) FROM passages').fetchone()[0],
+            'passages': meta['passages'],
+            'terms': conn.execute('SELECT COUNT(*) FROM terms').fetchone()[0],
+            'passages_with_vectors': conn.execute('SELECT COUNT(*) FROM passages WHERE vector IS NOT NULL').fetchone()[0],
+            'vector_search': self.embed is not None
+        }
+
+def read_articles(path):
+    """Articles from a JSONL file with link (or url), title and text fields"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Build and query the local evidence index')
+    parser.add_argument('--index', default=os.getenv('EVIDENCE_INDEX_PATH', 'evidence_index.db'))
+    parser.add_argument('--no-vectors', action='store_true', help='BM25 only (skip the sentence model)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help='index (or re-index) articles from a JSONL file')
+    add.add_argument('path')
+    search = commands.add_parser('search', help='show the top passages for a query')
+    search.add_argument('query')
+    search.add_argument('-n', '--num-results', type=int, default=5)
+    remove = commands.add_parser('remove', help='drop an article by link')
+    remove.add_argument('link')
+    commands.add_parser('stats', help='show index size')
+    args = parser.parse_args()
+
+    embed = None
+    if not args.no_vectors and args.command in ('add', 'search'):
+        from claim_extractor import get_embedding_service
+        service = get_embedding_service()
+        embed = service.encode if service is not None else None
+    index = EvidenceIndex(args.index, embed=embed)
+
+    if args.command == 'add':
+        start = time.perf_counter()
+        written = index.add(read_articles(args.path))
+        print(f"Indexed {written} passages in {time.perf_counter() - start:.1f}s")
+        print(index.stats())
+    elif args.command == 'search':
+        start = time.perf_counter()
+        results = index.search(args.query, args.num_results)
+        elapsed = (time.perf_counter() - start) * 1000
+        for result in results.get('organic_results', []):
+            print(f"{result['position']}. {result['title']} <{result['link']}>\n   {result['snippet']}")
+        print(f"({elapsed:.1f} ms)")
+    elif args.command == 'remove':
+        print(f"Removed {index.remove(args.link)} passages")
+    else:
+        print(index.stats())
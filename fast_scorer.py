@@ -0,0 +1,180 @@
+"""
+Pure-NumPy fast path for the linear TF-IDF model
+
+For a binary linear model on L2-normalized TF-IDF features the score of a
+document reduces to
+
+    z = intercept + sum(tf * idf * coef) / sqrt(sum((tf * idf) ** 2))
+
+so FastLinearScorer precomputes idf * coef and idf ** 2 per column and
+skips sklearn's input validation and sparse-matrix construction entirely.
+"""
+
+import time
+from collections import Counter
+
+import numpy as np
+
+class FastLinearScorer:
+    """Score texts directly from vocabulary, IDF and coefficient arrays"""
+
+    def __init__(self, analyzer, columns_for, idf, coef, intercept, classes,
+                 sublinear_tf=False, binary=False, use_idf=True, norm='l2'):
+        if norm not in ('l1', 'l2', None):
+            raise ValueError(f"Unsupported norm: {norm!r}")
+        self.analyzer = analyzer
+        self.columns_for = columns_for
+        idf = np.asarray(idf, dtype=np.float64) if use_idf else np.ones(len(coef))
+        coef = np.asarray(coef, dtype=np.float64)
+        self.weight = idf * coef
+        self.idf = idf
+        self.idf_sq = idf * idf
+        self.intercept = float(intercept)
+        self.classes_ = np.asarray(classes)
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.norm = norm
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, model):
+        """Build from a fitted TfidfVectorizer and binary linear classifier"""
+        if not hasattr(vectorizer, 'vocabulary_') or not hasattr(vectorizer, 'use_idf'):
+            raise ValueError("FastLinearScorer needs a fitted TfidfVectorizer")
+        if model.coef_.shape[0] != 1:
+            raise ValueError("FastLinearScorer only supports binary classifiers")
+        vocabulary = vectorizer.vocabulary_
+
+        def columns_for(terms):
+            return [vocabulary[t] for t in terms if t in vocabulary]
+
+        idf = vectorizer.idf_ if vectorizer.use_idf else None
+        return cls(vectorizer.build_analyzer(), columns_for, idf, model.coef_[0],
+                   model.intercept_[0], model.classes_, vectorizer.sublinear_tf,
+                   vectorizer.binary, vectorizer.use_idf, vectorizer.norm)
+
+    @classmethod
+    def from_artifact(cls, vectorizer, model):
+        """Build from a CompactVectorizer/CompactLinearModel (memory-mapped arrays)"""
+        def columns_for(terms):
+            return vectorizer.lookup(terms).tolist()
+
+        return cls(vectorizer.analyze, columns_for, vectorizer.idf, model.coef,
+                   model.intercept, model.classes_, vectorizer.sublinear_tf,
+                   vectorizer.binary, vectorizer.use_idf, vectorizer.norm)
+
+    def _tf(self, counts):
+        if self.binary:
+            return np.ones(len(counts))
+        counts = np.asarray(counts, dtype=np.float64)
+        return 1.0 + np.log(counts) if self.sublinear_tf else counts
+
+    def transform(self, texts):
+        """(doc index, column, tf) triplets for a batch of texts"""
+        doc_ids = []
+        columns = []
+        counts = []
+        for i, text in enumerate(texts):
+            counted = Counter(self.columns_for(self.analyzer(text)))
+            doc_ids.extend([i] * len(counted))
+            columns.extend(counted.keys())
+            counts.extend(counted.values())
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        return len(texts), doc_ids, columns, self._tf(counts)
+
+    def decision_function_features(self, features):
+        """Linear score for each document of a transform() result"""
+        n, doc_ids, columns, tf = features
+        dot = np.bincount(doc_ids, weights=tf * self.weight[columns], minlength=n)
+        if self.norm == 'l2':
+            scale = np.sqrt(np.bincount(doc_ids, weights=tf * tf * self.idf_sq[columns], minlength=n))
+        elif self.norm == 'l1':
+            scale = np.bincount(doc_ids, weights=np.abs(tf * self.idf[columns]), minlength=n)
+        else:
+            scale = np.ones(n)
+        scale[scale == 0] = 1.0
+        return self.intercept + dot / scale
+
+    def predict_proba_features(self, features):
+        """Probabilities as [[p(class 0), p(class 1)], ...] for a transform() result"""
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function_features(features)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def decision_function(self, texts):
+        """Linear score for each text, computed over the whole batch at once"""
+        return self.decision_function_features(self.transform(texts))
+
+    def predict_proba(self, texts):
+        """Probabilities as [[p(class 0), p(class 1)], ...], like sklearn"""
+        return self.predict_proba_features(self.transform(texts))
+
+    def predict(self, texts):
+        return self.classes_[(self.decision_function(texts) > 0).astype(int)]
+
+def build_scorer(model, vectorizer):
+    """Fast scorer for a loaded model, or None if the model isn't supported"""
+    try:
+        if hasattr(vectorizer, 'lookup'):
+            return FastLinearScorer.from_artifact(vectorizer, model)
+        return FastLinearScorer.from_sklearn(vectorizer, model)
+    except (AttributeError, ValueError):
+        return None
+
+def check_equivalence(model, vectorizer, texts, tolerance=1e-9):
+    """Max absolute probability difference between the fast path and sklearn"""
+    scorer = build_scorer(model, vectorizer)
+    if scorer is None:
+        raise ValueError("Model is not supported by the fast scorer")
+    expected = model.predict_proba(vectorizer.transform(texts))
+    difference = float(np.abs(scorer.predict_proba(texts) - expected).max())
+    if difference > tolerance:
+        raise AssertionError(f"Fast scorer differs from sklearn by {difference:.3e} (> {tolerance:g})")
+    return difference
+
+def benchmark(model, vectorizer, texts, repeat=5):
+    """p50/p99 single-text latency of sklearn vs the fast scorer"""
+    scorer = build_scorer(model, vectorizer)
+
+    def latencies(fn):
+        samples = []
+        for _ in range(repeat):
+            for text in texts:
+                start = time.perf_counter()
+                fn([text])
+                samples.append((time.perf_counter() - start) * 1e6)
+        return np.percentile(samples, [50, 99])
+
+    sklearn_p = latencies(lambda batch: model.predict_proba(vectorizer.transform(batch)))
+    fast_p = latencies(scorer.predict_proba)
+    print(f"\nSingle-text latency over {len(texts) * repeat} calls (microseconds):")
+    print(f"  sklearn transform + predict_proba  p50 {sklearn_p[0]:8.1f}  p99 {sklearn_p[1]:8.1f}")
+    print(f"  FastLinearScorer.predict_proba     p50 {fast_p[0]:8.1f}  p99 {fast_p[1]:8.1f}")
+    print(f"  speedup                            p50 {sklearn_p[0] / fast_p[0]:7.1f}x  p99 {sklearn_p[1] / fast_p[1]:7.1f}x\n")
+    return sklearn_p, fast_p
+
+if __name__ == "__main__":
+    import argparse
+    import joblib
+    from model_artifact import MODEL_PATH, VECTORIZER_PATH
+    from text_normalizer import normalizer_for
+
+    parser = argparse.ArgumentParser(description='Check and benchmark the fast linear scorer')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--vectorizer', default=VECTORIZER_PATH)
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    vectorizer = joblib.load(args.vectorizer)
+    base = [
+        "India's prime minister is Narendra Modi.",
+        "BREAKING!!! Aliens land in Washington DC!!!",
+        "Scientists discover promising new treatment for Alzheimer's disease in clinical trials.",
+        "Global leaders gather for climate summit to discuss carbon emissions reduction targets.",
+        "5G towers cause coronavirus!!!",
+        "",
+    ]
+    texts = normalizer_for(vectorizer).normalize_many([t * (1 + i % 4) for i, t in enumerate(base * 20)])
+
+    difference = check_equivalence(model, vectorizer, texts)
+    print(f"✓ Fast scorer matches sklearn (max probability difference {difference:.2e})")
+    benchmark(model, vectorizer, texts)
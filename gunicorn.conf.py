@@ -0,0 +1,58 @@
+"""
+Gunicorn settings for the production API
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app (and model) is loaded once in the master process and workers are
+forked from it, so the model arrays are shared copy-on-write. On SIGTERM
+workers stop accepting connections and get graceful_timeout seconds to
+finish the requests they already have.
+"""
+
+import gc
+import os
+
+bind = os.getenv('WEB_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_WORKERS', str(os.cpu_count() or 1)))
+threads = int(os.getenv('WEB_THREADS', '4'))
+worker_class = 'gthread'
+preload_app = True
+timeout = int(os.getenv('WEB_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+accesslog = os.getenv('WEB_ACCESS_LOG') or None
+
+def when_ready(server):
+    # Keep the preloaded model out of the garbage collector's way, so
+    # collections in the workers don't write to (and un-share) its pages
+    gc.freeze()
+
+def on_reload(server):
+    # HUP forks new workers from the master, so the master has to load (and
+    # canary-check) the new model itself or they would keep the old one
+    from app import reload_model
+    reload_model()
+    gc.freeze()
+
+def post_fork(server, worker):
+    # Threads don't survive fork, so each worker watches the model files itself
+    from app import start_model_watcher
+    start_model_watcher()
+
+def post_worker_init(worker):
+    # The worker has installed its own signal handlers by now. Chain SIGTERM
+    # so /api/ready fails from the moment the graceful shutdown starts, not
+    # only after the in-flight requests have drained
+    import signal
+    from app import start_draining
+    graceful_exit = signal.getsignal(signal.SIGTERM)
+
+    def handle_term(signum, frame):
+        start_draining()
+        graceful_exit(signum, frame)
+
+    signal.signal(signal.SIGTERM, handle_term)
+
+def worker_exit(server, worker):
+    from app import shutdown
+    shutdown()
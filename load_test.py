@@ -0,0 +1,69 @@
+"""
+Concurrent load test for the prediction API
+
+    python load_test.py --url http://localhost:5000 --concurrency 16 --requests 2000
+
+Each request gets a unique text so the prediction cache can't answer it.
+Reports throughput, latency percentiles and errors.
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+TEXTS = [
+    "Scientists discover promising new treatment for Alzheimer's disease in clinical trials.",
+    "BREAKING!!! Aliens land in Washington DC!!! Government confirms extraterrestrial contact!",
+    "Global leaders gather for climate summit to discuss carbon emissions reduction targets.",
+    "SHOCKING: Drinking water causes cancer, doctors don't want you to know this one trick!",
+]
+
+def run(url, concurrency, total, timeout=30):
+    """Send total requests from concurrency threads; returns latencies (ms) and error count"""
+    endpoint = url.rstrip('/') + '/api/predict'
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def send(i):
+        body = json.dumps({'text': f"{TEXTS[i % len(TEXTS)]} (report {i})"}).encode('utf-8')
+        req = urllib.request.Request(endpoint, data=body, headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                response.read()
+            ok = True
+        except (urllib.error.URLError, OSError):
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors[0] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, range(total)))
+    return latencies, errors[0], time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load test the prediction API')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    latencies, errors, elapsed = run(args.url, args.concurrency, args.requests)
+    print(f"\n{args.requests} requests, {args.concurrency} concurrent, {elapsed:.1f}s")
+    print(f"  Throughput: {len(latencies) / elapsed:.1f} req/s")
+    if latencies:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"  Latency:    p50 {p50:.1f} ms  p95 {p95:.1f} ms  p99 {p99:.1f} ms")
+    print(f"  Errors:     {errors}\n")
@@ -0,0 +1,137 @@
+"""
+In-process metrics in the Prometheus text format
+
+    with timed('vectorize'):
+        X = vectorizer.transform(texts)
+    CACHE_LOOKUPS.inc(cache='prediction', result='hit')
+
+Metrics are kept per process; `render()` produces the text served at
+/metrics. Under gunicorn each worker reports its own numbers, so scrape
+every worker or aggregate by instance label.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+_registry = []
+
+def _label_text(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+class Counter:
+    """Monotonically increasing count, optionally split by labels"""
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels[name] for name in self.labels), 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_label_text(self.labels, key)} {value}')
+        return lines
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, optionally split by labels"""
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += 1
+            series[-1] += value
+
+    def snapshot(self, **labels):
+        """(count, sum) for one label combination"""
+        series = self._series.get(tuple(labels[name] for name in self.labels))
+        return (series[-2], series[-1]) if series else (0, 0.0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{_label_text(self.labels, key, [("le", bound)])} {cumulative}')
+                lines.append(f'{self.name}_bucket{_label_text(self.labels, key, [("le", "+Inf")])} {series[-2]}')
+                lines.append(f'{self.name}_count{_label_text(self.labels, key)} {series[-2]}')
+                lines.append(f'{self.name}_sum{_label_text(self.labels, key)} {series[-1]:.6f}')
+        return lines
+
+STAGE_SECONDS = Histogram('pipeline_stage_seconds', 'Time spent in each pipeline stage', labels=('stage',))
+STAGE_ERRORS = Counter('pipeline_errors_total', 'Errors raised in each pipeline stage', labels=('stage',))
+CACHE_LOOKUPS = Counter('cache_lookups_total', 'Cache lookups by cache and result', labels=('cache', 'result'))
+BATCH_SIZE = Histogram('batch_size', 'Items per batch at each stage', labels=('stage',), buckets=SIZE_BUCKETS)
+HTTP_REQUESTS = Counter('http_requests_total', 'HTTP requests by endpoint and status', labels=('endpoint', 'status'))
+ANALYZE_REQUESTS = Counter('analyze_requests_total', 'Analyze requests by the tier that answered', labels=('tier',))
+ANALYZE_ESCALATIONS = Counter('analyze_escalations_total', 'Analyze escalations to claim verification by outcome',
+                              labels=('outcome',))
+HTTP_SECONDS = Histogram('http_request_seconds', 'HTTP request latency by endpoint', labels=('endpoint',))
+
+@contextmanager
+def timed(stage, items=None):
+    """Record how long the block takes (and its batch size) under a stage label
+
+    Exceptions are counted in pipeline_errors_total and re-raised.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+        if items is not None:
+            BATCH_SIZE.observe(items, stage=stage)
+
+def render():
+    """Every registered metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+def configure_logging(default='INFO'):
+    """Set up logging at the LOG_LEVEL environment variable's level"""
+    level = os.getenv('LOG_LEVEL', default).upper()
+    logging.basicConfig(level=level, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
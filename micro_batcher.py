@@ -0,0 +1,138 @@
+"""
+Coalesce concurrent single-item calls into batches
+
+Concurrent /api/predict requests each call MicroBatcher.submit(text). When
+nothing else is queued or being scored, the caller runs the batch function
+on its own item right away, so an idle server adds no latency. Otherwise
+the item is queued: a background thread collects the queue, waiting at most
+`max_wait_ms` after the first arrival (or until `max_batch` are waiting)
+while another batch is still being scored, then scores everything with one
+call of the batch function and hands each caller its own result.
+"""
+
+import threading
+import time
+from collections import deque
+
+from metrics import BATCH_SIZE, Histogram
+
+WAIT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)
+WAIT_SECONDS = Histogram('microbatch_wait_seconds', 'Time a request waited for its micro-batch to start',
+                         labels=('batcher',), buckets=WAIT_BUCKETS)
+
+class _Slot:
+    __slots__ = ('item', 'arrived', 'done', 'result', 'error')
+
+    def __init__(self, item):
+        self.item = item
+        self.arrived = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class MicroBatcher:
+    """Run fn(list of items) -> list of results over batches of concurrent submits"""
+
+    def __init__(self, fn, max_batch=32, max_wait_ms=1.0, name='predict'):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self._busy = 0  # batches being scored right now
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_thread(self):
+        # Started lazily so it is created in the process that uses it (after a fork)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name=f'{self.name}-batcher', daemon=True)
+            self._thread.start()
+
+    def submit(self, item):
+        """Block until item has been processed as part of a batch; returns its result"""
+        slot = _Slot(item)
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("Micro-batcher is stopped")
+            direct = not self._queue and not self._busy
+            if direct:
+                self._busy += 1
+            else:
+                self._ensure_thread()
+                self._queue.append(slot)
+                self._cond.notify()
+        if direct:
+            self._run([slot])
+        slot.done.wait()
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def _next_batch(self):
+        """Wait for the first item, then up to max_wait for the batch to fill
+
+        The wait only applies while another batch is being scored; items
+        that queued up behind a batch that has finished go out at once.
+        """
+        with self._cond:
+            while not self._queue and not self._stopped:
+                self._cond.wait()
+            if not self._queue:
+                return []
+            deadline = self._queue[0].arrived + self.max_wait
+            while len(self._queue) < self.max_batch and self._busy and not self._stopped:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            self._busy += 1
+            return [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+
+    def _run(self, batch):
+        """Score one batch (counted in _busy by the caller) and wake its submitters"""
+        started = time.perf_counter()
+        for slot in batch:
+            WAIT_SECONDS.observe(started - slot.arrived, batcher=self.name)
+        BATCH_SIZE.observe(len(batch), stage=f'{self.name}_microbatch')
+        try:
+            results = self.fn([slot.item for slot in batch])
+            for slot, result in zip(batch, results):
+                slot.result = result
+        except Exception as e:
+            for slot in batch:
+                slot.error = e
+        with self._cond:
+            self._busy -= 1
+            self.batches += 1
+            self.items += len(batch)
+            self._cond.notify_all()
+        for slot in batch:
+            slot.done.set()
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self._run(batch)
+
+    def stats(self):
+        count, total_wait = WAIT_SECONDS.snapshot(batcher=self.name)
+        return {
+            'max_batch': self.max_batch,
+            'max_wait_ms': self.max_wait * 1000,
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+            'mean_wait_ms': round(total_wait / count * 1000, 3) if count else 0.0
+        }
+
+    def stop(self):
+        """Finish the queued items and stop the background thread"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
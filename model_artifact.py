@@ -0,0 +1,284 @@
+"""
+Compact, memory-mappable model artifact
+
+A fitted TfidfVectorizer + linear classifier is stored as a directory of
+flat NumPy arrays plus a manifest:
+
+  manifest.json      format version, vectorizer settings, checksums
+  vocabulary.npy     sorted UTF-8 terms (fixed-width bytes)
+  feature_index.npy  column index of each sorted term
+  idf.npy            IDF weight per column
+  coef.npy           classifier coefficient per column
+
+Workers open the arrays with mmap_mode='r', so every process on a host
+shares the same pages and loading takes milliseconds instead of
+unpickling a Python dict vocabulary.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+
+from text_normalizer import TextNormalizer
+
+FORMAT_NAME = 'fake-news-linear'
+FORMAT_VERSION = 1
+ARTIFACT_DIR = 'simple_model_artifact'
+MODEL_PATH = 'simple_model.pkl'
+VECTORIZER_PATH = 'simple_vectorizer.pkl'
+
+ARRAY_FILES = ('vocabulary.npy', 'feature_index.npy', 'idf.npy', 'coef.npy')
+
+class ArtifactError(Exception):
+    """Raised when an artifact is missing, corrupt or of an unsupported version"""
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def export_artifact(vectorizer, model, path=ARTIFACT_DIR):
+    """Write a fitted TfidfVectorizer and binary linear model as a compact artifact"""
+    if not hasattr(vectorizer, 'vocabulary_') or not hasattr(vectorizer, 'idf_'):
+        raise ArtifactError("Only fitted TfidfVectorizer models can be exported")
+    if vectorizer.analyzer != 'word' or vectorizer.preprocessor is not None or vectorizer.tokenizer is not None:
+        raise ArtifactError("Only the built-in word analyzer can be exported")
+    if model.coef_.shape[0] != 1:
+        raise ArtifactError("Only binary linear classifiers can be exported")
+
+    os.makedirs(path, exist_ok=True)
+    terms = sorted(vectorizer.vocabulary_, key=lambda t: t.encode('utf-8'))
+    vocabulary = np.array([t.encode('utf-8') for t in terms], dtype=np.bytes_)
+    feature_index = np.array([vectorizer.vocabulary_[t] for t in terms], dtype=np.int32)
+
+    arrays = {
+        'vocabulary.npy': vocabulary,
+        'feature_index.npy': feature_index,
+        'idf.npy': np.asarray(vectorizer.idf_, dtype=np.float64),
+        'coef.npy': np.asarray(model.coef_[0], dtype=np.float64),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(path, name), array)
+
+    stop_words = vectorizer.get_stop_words()
+    normalizer = getattr(vectorizer, 'normalizer_', None)
+    files = {name: _sha256(os.path.join(path, name)) for name in ARRAY_FILES}
+    manifest = {
+        'format': FORMAT_NAME,
+        'format_version': FORMAT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'n_features': int(len(vectorizer.idf_)),
+        'classes': [int(c) for c in model.classes_],
+        'intercept': float(model.intercept_[0]),
+        'vectorizer': {
+            'lowercase': bool(vectorizer.lowercase),
+            'strip_accents': vectorizer.strip_accents,
+            'token_pattern': vectorizer.token_pattern,
+            'ngram_range': list(vectorizer.ngram_range),
+            'stop_words': sorted(stop_words) if stop_words else None,
+            'binary': bool(vectorizer.binary),
+            'sublinear_tf': bool(vectorizer.sublinear_tf),
+            'use_idf': bool(vectorizer.use_idf),
+            'norm': vectorizer.norm,
+        },
+        'normalizer': normalizer.mode if normalizer is not None else None,
+        'files': files,
+        'checksum': hashlib.sha256(''.join(files[name] for name in ARRAY_FILES).encode()).hexdigest(),
+    }
+    with open(os.path.join(path, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def _strip_accents(text, mode):
+    if mode == 'ascii':
+        return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    if mode == 'unicode':
+        return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+    return text
+
+class CompactVectorizer:
+    """TF-IDF transform over memory-mapped arrays (sklearn word analyzer semantics)"""
+
+    def __init__(self, manifest, vocabulary, feature_index, idf):
+        settings = manifest['vectorizer']
+        self.manifest = manifest
+        self.vocabulary = vocabulary
+        self.feature_index = feature_index
+        self.idf = idf
+        self.n_features = manifest['n_features']
+        self.lowercase = settings['lowercase']
+        self.strip_accents = settings['strip_accents']
+        self.token_regex = re.compile(settings['token_pattern'])
+        self.ngram_range = tuple(settings['ngram_range'])
+        self.stop_words = frozenset(settings['stop_words'] or ())
+        self.binary = settings['binary']
+        self.sublinear_tf = settings['sublinear_tf']
+        self.use_idf = settings['use_idf']
+        self.norm = settings['norm']
+        if manifest.get('normalizer'):
+            self.normalizer_ = TextNormalizer(manifest['normalizer'])
+
+    def analyze(self, text):
+        """Terms of one document, as sklearn's word analyzer produces them"""
+        if self.lowercase:
+            text = text.lower()
+        if self.strip_accents:
+            text = _strip_accents(text, self.strip_accents)
+        tokens = self.token_regex.findall(text)
+        if self.stop_words:
+            tokens = [t for t in tokens if t not in self.stop_words]
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        terms = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            terms.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return terms
+
+    def lookup(self, terms):
+        """Column indices for the terms that are in the vocabulary"""
+        if not terms:
+            return np.zeros(0, dtype=np.int64)
+        keys = np.array([t.encode('utf-8') for t in terms], dtype=np.bytes_)
+        positions = np.searchsorted(self.vocabulary, keys)
+        positions[positions >= len(self.vocabulary)] = 0
+        found = self.vocabulary[positions] == keys
+        return self.feature_index[positions[found]].astype(np.int64)
+
+    def transform(self, texts):
+        """Sparse TF-IDF matrix with one row per text"""
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            columns, counts = np.unique(self.lookup(self.analyze(text)), return_counts=True)
+            values = counts.astype(np.float64)
+            if self.binary:
+                values[:] = 1.0
+            elif self.sublinear_tf:
+                values = 1.0 + np.log(values)
+            if self.use_idf:
+                values = values * self.idf[columns]
+            if self.norm == 'l2' and len(values):
+                values = values / np.sqrt(np.dot(values, values))
+            elif self.norm == 'l1' and len(values):
+                values = values / np.abs(values).sum()
+            indices.append(columns)
+            data.append(values)
+            indptr.append(indptr[-1] + len(columns))
+        indices = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64)
+        data = np.concatenate(data) if data else np.zeros(0)
+        return sp.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, self.n_features))
+
+class CompactLinearModel:
+    """Binary logistic model over a memory-mapped coefficient vector"""
+
+    def __init__(self, manifest, coef):
+        self.coef = coef
+        self.intercept = manifest['intercept']
+        self.classes_ = np.array(manifest['classes'])
+
+    def decision_function(self, X):
+        return np.asarray(X @ self.coef).ravel() + self.intercept
+
+    def predict_proba(self, X):
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+def load_artifact(path=ARTIFACT_DIR, mmap=True, verify=True):
+    """Open a compact artifact; returns (model, vectorizer, manifest)"""
+    manifest_path = os.path.join(path, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        raise ArtifactError(f"No artifact manifest at {manifest_path}")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_NAME or manifest.get('format_version') != FORMAT_VERSION:
+        raise ArtifactError(f"Unsupported artifact format: {manifest.get('format')} v{manifest.get('format_version')}")
+
+    if verify:
+        for name in ARRAY_FILES:
+            if _sha256(os.path.join(path, name)) != manifest['files'][name]:
+                raise ArtifactError(f"Checksum mismatch for {name}")
+
+    mode = 'r' if mmap else None
+    arrays = {name: np.load(os.path.join(path, name), mmap_mode=mode) for name in ARRAY_FILES}
+    vectorizer = CompactVectorizer(manifest, arrays['vocabulary.npy'], arrays['feature_index.npy'], arrays['idf.npy'])
+    model = CompactLinearModel(manifest, arrays['coef.npy'])
+    return model, vectorizer, manifest
+
+def has_artifact(path=ARTIFACT_DIR):
+    return os.path.exists(os.path.join(path, 'manifest.json'))
+
+def remove_artifact(path=ARTIFACT_DIR):
+    """Delete a compact artifact so it can't shadow newer pickled models"""
+    for name in ARRAY_FILES + ('manifest.json',):
+        file_path = os.path.join(path, name)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+def _file_digest(*paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(_sha256(path).encode())
+    return digest.hexdigest()[:12]
+
+def load_model_files(artifact_dir=ARTIFACT_DIR, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH):
+    """Load the compact artifact if present, else the pickled model/vectorizer
+
+    Returns (model, vectorizer, version) where version identifies the
+    exact model contents.
+    """
+    if artifact_dir and has_artifact(artifact_dir):
+        model, vectorizer, manifest = load_artifact(artifact_dir)
+        return model, vectorizer, manifest['checksum'][:12]
+    model = joblib.load(model_path)
+    vectorizer = joblib.load(vectorizer_path)
+    return model, vectorizer, _file_digest(model_path, vectorizer_path)
+
+def _check(artifact_dir, model_path, vectorizer_path):
+    """Compare the compact artifact with the pickled model on sample texts"""
+    model = joblib.load(model_path)
+    vectorizer = joblib.load(vectorizer_path)
+    start = time.perf_counter()
+    compact_model, compact_vectorizer, manifest = load_artifact(artifact_dir)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    texts = [
+        "global leaders gather for climate summit to discuss carbon emissions",
+        "aliens have been living among us for decades government admits",
+        "",
+    ]
+    expected = model.predict_proba(vectorizer.transform(texts))
+    actual = compact_model.predict_proba(compact_vectorizer.transform(texts))
+    difference = float(np.abs(expected - actual).max())
+    print(f"✓ Artifact v{manifest['format_version']} ({manifest['checksum'][:12]}) loaded in {load_ms:.1f} ms")
+    print(f"  Max probability difference vs pickled model: {difference:.2e}")
+    return difference
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export or check the compact model artifact')
+    parser.add_argument('command', choices=['export', 'check'])
+    parser.add_argument('--artifact', default=ARTIFACT_DIR)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--vectorizer', default=VECTORIZER_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        manifest = export_artifact(joblib.load(args.vectorizer), joblib.load(args.model), args.artifact)
+        print(f"✓ Exported {manifest['n_features']} features to {args.artifact}/ ({manifest['checksum'][:12]})")
+    else:
+        _check(args.artifact, args.model, args.vectorizer)
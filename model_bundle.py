@@ -0,0 +1,71 @@
+"""
+Loaded model versions for the API
+
+A ModelBundle holds a model/vectorizer pair together with everything
+derived from it (normalizer, fast scorer, version). The API keeps one
+bundle in a single global and replaces it with one assignment, so a
+request that picked up a bundle keeps scoring on it even if a reload
+happens mid-request.
+"""
+
+import time
+
+import numpy as np
+
+from fast_scorer import build_scorer
+from metrics import timed
+from model_artifact import load_model_files
+from text_normalizer import normalizer_for
+
+class CanaryError(Exception):
+    """Raised when a newly loaded model fails its canary check"""
+
+class ModelBundle:
+    """One loaded model version and the helpers built from it"""
+
+    def __init__(self, model, vectorizer, version, fast_scorer=True):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.version = version
+        self.normalizer = normalizer_for(vectorizer)
+        self.scorer = build_scorer(model, vectorizer) if fast_scorer else None
+        self.loaded_at = time.time()
+
+    @classmethod
+    def load(cls, artifact_dir, model_path, vectorizer_path, fast_scorer=True):
+        """Load the compact artifact or pickles into a new bundle"""
+        model, vectorizer, version = load_model_files(artifact_dir, model_path, vectorizer_path)
+        return cls(model, vectorizer, version, fast_scorer)
+
+    def predict_proba(self, cleaned_texts):
+        """Probabilities for already-normalized texts"""
+        with timed('vectorize', len(cleaned_texts)):
+            if self.scorer is not None:
+                features = self.scorer.transform(cleaned_texts)
+            else:
+                features = self.vectorizer.transform(cleaned_texts)
+        with timed('predict'):
+            if self.scorer is not None:
+                return self.scorer.predict_proba_features(features)
+            return self.model.predict_proba(features)
+
+    def canary(self, cases):
+        """Score (text, expected label) cases; returns the number correct
+
+        Raises CanaryError if the model produces unusable probabilities.
+        """
+        texts = self.normalizer.normalize_many([text for text, _ in cases])
+        probas = np.asarray(self.predict_proba(texts), dtype=np.float64)
+        if probas.shape != (len(cases), 2) or not np.isfinite(probas).all():
+            raise CanaryError(f"Model {self.version} returned malformed probabilities")
+        if not np.allclose(probas.sum(axis=1), 1.0, atol=1e-6):
+            raise CanaryError(f"Model {self.version} probabilities don't sum to 1")
+        predicted = np.where(probas[:, 1] > probas[:, 0], 'REAL', 'FAKE')
+        return int(sum(label == expected for label, (_, expected) in zip(predicted, cases)))
+
+    def describe(self):
+        return {
+            'version': self.version,
+            'loaded_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.loaded_at)),
+            'fast_scorer': self.scorer is not None
+        }
@@ -2,53 +2,77 @@
 Simple Prediction Script - Works with short text!
 """
 
-import pickle
 import os
-import re
+import sys
+import csv
+import json
+import time
+from contextlib import redirect_stdout
+from itertools import islice, tee
+
+from model_artifact import ARTIFACT_DIR, has_artifact, load_model_files
+from text_normalizer import TextNormalizer, normalizer_for
+
+_article_normalizer = TextNormalizer('article')
+
+# Sample news with expected labels; also the canary set the API checks a
+# newly trained model against before switching to it
+CANARY_CASES = [
+    ("India's prime minister is Narendra Modi.", "REAL"),
+    ("India's prime minister is Athul Raj.", "FAKE"),
+    ("India's prime minister is Vijay Prasath.", "FAKE"),
+    ("The President of USA is Joe Biden.", "REAL"),
+    ("The President of USA is John Smith.", "FAKE"),
+    ("BREAKING!!! Aliens land in Washington DC!!!", "FAKE"),
+    ("Scientists discover new exoplanet in habitable zone.", "REAL"),
+    ("SHOCKING: Moon is made of cheese!!!", "FAKE"),
+    ("The Earth orbits around the Sun.", "REAL"),
+    ("5G towers cause coronavirus!!!", "FAKE"),
+]
 
 def clean_text_simple(text):
-    """Simple text cleaning"""
-    text = str(text).lower()
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
-    text = re.sub(r'<.*?>', '', text)
-    text = re.sub(r'\[.*?\]', '', text)
-    text = re.sub(r'[^a-zA-Z\s\.\!\?]', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    """Simple text cleaning (URLs, HTML and brackets removed)
+
+    Prediction uses the normalizer stored with the model instead, so that
+    text is cleaned exactly as it was during training.
+    """
+    return _article_normalizer.normalize(text)
 
 def load_model():
     """Load the trained model"""
-    if not os.path.exists('simple_model.pkl'):
+    if not has_artifact(ARTIFACT_DIR) and not os.path.exists('simple_model.pkl'):
         print("❌ Model not found!")
         print("\nPlease train the model first:")
         print("  python train_simple_working.py")
         return None, None
     
-    with open('simple_model.pkl', 'rb') as f:
-        model = pickle.load(f)
-    
-    with open('simple_vectorizer.pkl', 'rb') as f:
-        vectorizer = pickle.load(f)
+    model, vectorizer, _ = load_model_files(ARTIFACT_DIR, 'simple_model.pkl', 'simple_vectorizer.pkl')
     
     print("✓ Model and vectorizer loaded")
     return model, vectorizer
 
-def predict_news(text, model, vectorizer):
-    """Predict if news is fake or real"""
-    cleaned = clean_text_simple(text)
-    vec = vectorizer.transform([cleaned])
-    pred = model.predict(vec)[0]
-    proba = model.predict_proba(vec)[0]
-    
-    result = {
-        'prediction': 'REAL' if pred == 1 else 'FAKE',
-        'label': pred,
-        'fake_probability': proba[0] * 100,
-        'real_probability': proba[1] * 100,
-        'confidence': max(proba) * 100
+def format_probabilities(proba):
+    """Build a result dict from one row of predict_proba output"""
+    label = 1 if proba[1] > proba[0] else 0
+    return {
+        'prediction': 'REAL' if label == 1 else 'FAKE',
+        'label': label,
+        'fake_probability': float(proba[0] * 100),
+        'real_probability': float(proba[1] * 100),
+        'confidence': float(max(proba) * 100)
     }
+
+def predict_many(texts, model, vectorizer):
+    """Predict a list of texts with one transform and predict_proba pass"""
+    cleaned = normalizer_for(vectorizer).normalize_many(texts)
+    vec = vectorizer.transform(cleaned)
+    probas = model.predict_proba(vec)
     
-    return result
+    return [format_probabilities(proba) for proba in probas]
+
+def predict_news(text, model, vectorizer):
+    """Predict if news is fake or real"""
+    return predict_many([text], model, vectorizer)[0]
 
 def print_result(text, result):
     """Print formatted result"""
@@ -121,18 +145,7 @@ def batch_test():
     if model is None:
         return
     
-    test_cases = [
-        ("India's prime minister is Narendra Modi.", "REAL"),
-        ("India's prime minister is Athul Raj.", "FAKE"),
-        ("India's prime minister is Vijay Prasath.", "FAKE"),
-        ("The President of USA is Joe Biden.", "REAL"),
-        ("The President of USA is John Smith.", "FAKE"),
-        ("BREAKING!!! Aliens land in Washington DC!!!", "FAKE"),
-        ("Scientists discover new exoplanet in habitable zone.", "REAL"),
-        ("SHOCKING: Moon is made of cheese!!!", "FAKE"),
-        ("The Earth orbits around the Sun.", "REAL"),
-        ("5G towers cause coronavirus!!!", "FAKE"),
-    ]
+    test_cases = CANARY_CASES
     
     print("\n" + "="*70)
     print("TESTING WITH SAMPLE NEWS")
@@ -158,10 +171,153 @@ def batch_test():
     print(f"RESULTS: {correct}/{total} correct ({correct/total*100:.0f}%)")
     print(f"{'='*70}\n")
 
+class InvalidRecord(ValueError):
+    """Stands in for the text of a record that can't be scored"""
+
+def _parse_lines(stream):
+    for line in stream:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield InvalidRecord(f'Invalid JSON: {e}')
+
+def read_records(stream, fmt, text_field='text', id_field='id'):
+    """Yield (id, text) pairs from a JSONL or CSV stream, one line at a time
+
+    Numbers in the text field are scored as text. For a malformed line, a
+    record that isn't an object or a non-text text field, the text is an
+    InvalidRecord, so one bad record doesn't abort a long run.
+    """
+    if fmt == 'csv':
+        csv.field_size_limit(sys.maxsize)
+        rows = csv.DictReader(stream)
+    else:
+        rows = _parse_lines(stream)
+    
+    for index, row in enumerate(rows):
+        if isinstance(row, InvalidRecord):
+            yield index, row
+        elif not isinstance(row, dict):
+            yield index, InvalidRecord('Record is not a JSON object')
+        else:
+            text = row.get(text_field)
+            if isinstance(text, (int, float)) and not isinstance(text, bool):
+                text = str(text)
+            elif text is not None and not isinstance(text, str):
+                text = InvalidRecord(f'{text_field!r} is not a string')
+            yield row.get(id_field, index), text or ''
+
+def usable(text):
+    """True for a non-empty text from read_records()"""
+    return isinstance(text, str) and bool(text.strip())
+
+def iter_chunks(records, chunk_size):
+    """Group an iterable into lists of at most chunk_size items"""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def score_chunks(chunks, model, vectorizer, pool=None):
+    """Score each chunk and yield (records, chunk latency in seconds)
+
+    With a ScoringPool, chunks are scored in worker processes while the
+    next ones are being read.
+    """
+    def texts_of(chunk):
+        return [text for _, text in chunk if usable(text)]
+    
+    if pool is not None:
+        chunks, for_pool = tee(chunks)
+        results = zip(chunks, pool.map_chunks(texts_of(chunk) for chunk in for_pool))
+    else:
+        results = ((chunk, None) for chunk in chunks)
+    
+    last = time.perf_counter()
+    for chunk, probas in results:
+        if probas is None:
+            texts = texts_of(chunk)
+            predictions = predict_many(texts, model, vectorizer) if texts else []
+        else:
+            predictions = [format_probabilities(proba) for proba in probas]
+        
+        predictions = iter(predictions)
+        scored = []
+        for record_id, text in chunk:
+            if usable(text):
+                scored.append(dict({'id': record_id}, **next(predictions)))
+            elif isinstance(text, InvalidRecord):
+                scored.append({'id': record_id, 'error': str(text)})
+            else:
+                scored.append({'id': record_id, 'error': 'Empty text'})
+        
+        now = time.perf_counter()
+        yield scored, now - last
+        last = now
+
+def stream_mode(path, fmt=None, chunk_size=512, text_field='text', id_field='id', output=None, workers=0):
+    """Score a JSONL/CSV dump in fixed-size chunks and write NDJSON results"""
+    output = output or sys.stdout
+    if fmt is None:
+        fmt = 'csv' if path and path.lower().endswith('.csv') else 'jsonl'
+    
+    # Keep stdout clean for NDJSON; status messages go to stderr
+    with redirect_stdout(sys.stderr):
+        model, vectorizer = load_model()
+    if model is None:
+        return
+    
+    pool = None
+    if workers > 0:
+        from scoring_pool import ScoringPool
+        pool = ScoringPool(workers=workers, chunk_size=chunk_size)
+        print(f"✓ Scoring with {pool.workers} worker processes", file=sys.stderr)
+    
+    source = sys.stdin if path in (None, '-') else open(path, 'r', encoding='utf-8', newline='')
+    total = 0
+    start = time.perf_counter()
+    try:
+        records = read_records(source, fmt, text_field, id_field)
+        for n, (scored, latency) in enumerate(score_chunks(iter_chunks(records, chunk_size), model, vectorizer, pool), 1):
+            for result in scored:
+                output.write(json.dumps(result) + '\n')
+            output.flush()
+            
+            total += len(scored)
+            elapsed = time.perf_counter() - start
+            print(f"chunk {n}: {len(scored)} docs in {latency * 1000:.1f} ms "
+                  f"| total {total} docs, {total / elapsed:.0f} docs/sec", file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if pool is not None:
+            print(f"Worker stats: {json.dumps(pool.stats())}", file=sys.stderr)
+            pool.shutdown()
+    
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"✓ Scored {total} docs in {elapsed:.2f}s ({rate:.0f} docs/sec)", file=sys.stderr)
+
 if __name__ == "__main__":
-    import sys
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Simple fake news detector')
+    parser.add_argument('--test', action='store_true', help='run the predefined test cases')
+    parser.add_argument('--stream', nargs='?', const='-', metavar='PATH',
+                        help='score a JSONL/CSV file (or stdin) and write NDJSON to stdout')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], help='input format (default: from file extension)')
+    parser.add_argument('--chunk-size', type=int, default=512, help='documents scored per chunk')
+    parser.add_argument('--text-field', default='text', help='field holding the article text')
+    parser.add_argument('--id-field', default='id', help='field holding the article id')
+    parser.add_argument('--workers', type=int, default=0, help='scoring processes for --stream (0 = in-process)')
+    args = parser.parse_args()
     
-    if len(sys.argv) > 1 and sys.argv[1] == '--test':
+    if args.test:
         batch_test()
+    elif args.stream:
+        stream_mode(args.stream, args.format, args.chunk_size, args.text_field, args.id_field, workers=args.workers)
     else:
         interactive_mode()
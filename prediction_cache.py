@@ -0,0 +1,208 @@
+"""
+Prediction cache for the API
+
+Entries are keyed on a hash of the normalized text plus the model version,
+so a newly loaded model never serves stale predictions. Two backends share
+the same interface:
+
+  PredictionCache        - in-process, LRU + TTL, bounded by entry count
+  SQLitePredictionCache  - on-disk, shared by several API worker processes
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+def cache_key(normalized_text, model_version):
+    """Stable key for a normalized text scored by a given model version"""
+    digest = hashlib.sha256()
+    digest.update(str(model_version).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalized_text.encode('utf-8'))
+    return digest.hexdigest()
+
+class PredictionCache:
+    """Thread-safe in-memory LRU cache with a per-entry time-to-live"""
+
+    def __init__(self, max_entries=10000, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value, or None on a miss or expired entry"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            if self.ttl and now - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries if full"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss/eviction counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': 'memory',
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+class SQLitePredictionCache:
+    """On-disk LRU + TTL cache that several processes can share
+
+    Counters are per process; the stored entries are shared.
+    """
+
+    def __init__(self, path, max_entries=100000, ttl=3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._puts = 0
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS predictions ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'stored_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_predictions_accessed ON predictions (accessed_at)')
+
+    def _connect(self):
+        """One connection per thread; WAL lets readers and a writer run together
+
+        Connections are never reused across a fork (e.g. gunicorn workers
+        forked after the app was imported).
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, key):
+        """Return the cached value, or None on a miss or expired entry"""
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute('SELECT value, stored_at FROM predictions WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self._count('misses')
+            return None
+        value, stored_at = row
+        with conn:
+            if self.ttl and now - stored_at > self.ttl:
+                conn.execute('DELETE FROM predictions WHERE key = ?', (key,))
+                self._count('expirations')
+                self._count('misses')
+                return None
+            conn.execute('UPDATE predictions SET accessed_at = ? WHERE key = ?', (now, key))
+        self._count('hits')
+        return json.loads(value)
+
+    def put(self, key, value):
+        """Store a value; the least recently used rows are trimmed periodically"""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO predictions (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), now, now)
+            )
+        with self._lock:
+            self._puts += 1
+            trim = self._puts % 100 == 0
+        if trim:
+            self._trim(conn)
+
+    def _trim(self, conn):
+        """Delete expired rows and the oldest rows beyond max_entries"""
+        with conn:
+            if self.ttl:
+                expired = conn.execute('DELETE FROM predictions WHERE stored_at < ?', (time.time() - self.ttl,)).rowcount
+                with self._lock:
+                    self.expirations += expired
+            size = conn.execute('SELECT COUNT(*) FROM predictions').fetchone()[0]
+            excess = size - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    'DELETE FROM predictions WHERE key IN '
+                    '(SELECT key FROM predictions ORDER BY accessed_at LIMIT ?)', (excess,)
+                )
+                with self._lock:
+                    self.evictions += excess
+
+    def clear(self):
+        """Drop every entry"""
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM predictions')
+
+    def stats(self):
+        """Hit/miss/eviction counters and current size"""
+        size = self._connect().execute('SELECT COUNT(*) FROM predictions').fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': 'sqlite',
+                'path': self.path,
+                'size': size,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,201 @@
+"""
+Multi-process scoring pool for the TF-IDF + LogisticRegression model
+
+Each worker loads the model and vectorizer once at startup and scores
+chunks of texts. If a worker dies, the pool is rebuilt and the chunks that
+were in flight are resubmitted, so callers never lose a request.
+
+Workers read whatever model files are on disk when they start, which may
+not be the model the caller approved. Every chunk comes back tagged with
+the version it was scored with, and predict_proba() can be asked to drop
+chunks scored by any other version.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fast_scorer import build_scorer
+from model_artifact import ARTIFACT_DIR, MODEL_PATH, VECTORIZER_PATH, load_model_files
+from text_normalizer import normalizer_for
+
+# Per-process state, only populated inside worker processes
+_model = None
+_vectorizer = None
+_clean_fn = None
+_scorer = None
+_version = None
+
+def _init_worker(model_path, vectorizer_path, artifact_dir, clean_fn):
+    """Load the model and vectorizer once per worker process
+
+    A compact artifact is memory-mapped, so all workers share its pages.
+
+    clean_fn takes a list of texts; by default it is the normalizer saved
+    with the vectorizer.
+    """
+    global _model, _vectorizer, _clean_fn, _scorer, _version
+    _model, _vectorizer, _version = load_model_files(artifact_dir, model_path, vectorizer_path)
+    _scorer = build_scorer(_model, _vectorizer)
+    _clean_fn = clean_fn or normalizer_for(_vectorizer).normalize_many
+
+def _score_chunk(texts):
+    """Score one chunk inside a worker; returns (pid, model version, probabilities, busy seconds)"""
+    start = time.perf_counter()
+    if not texts:
+        return os.getpid(), _version, [], 0.0
+    texts = _clean_fn(texts)
+    if _scorer is not None:
+        probas = _scorer.predict_proba(texts)
+    else:
+        probas = _model.predict_proba(_vectorizer.transform(texts))
+    return os.getpid(), _version, probas.tolist(), time.perf_counter() - start
+
+class ScoringPool:
+    """Process pool that scores text chunks with a preloaded model in every worker"""
+
+    def __init__(self, workers=None, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH,
+                 artifact_dir=ARTIFACT_DIR, clean_fn=None, chunk_size=64, max_retries=2):
+        self.workers = workers or os.cpu_count() or 1
+        self.model_path = model_path
+        self.vectorizer_path = vectorizer_path
+        self.artifact_dir = artifact_dir
+        self.clean_fn = clean_fn
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.restarts = 0
+        self.version_mismatches = 0
+        self._lock = threading.Lock()
+        self._busy = {}
+        self._chunks = {}
+        self._generation = 0
+        self._executor = None
+        self._started = None
+        self._start_executor()
+
+    def _start_executor(self):
+        """Create a fresh executor and reset the utilization counters"""
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.model_path, self.vectorizer_path, self.artifact_dir, self.clean_fn)
+        )
+        self._generation += 1
+        self._started = time.perf_counter()
+        self._busy = {}
+        self._chunks = {}
+
+    def _restart(self, generation):
+        """Replace a broken executor, once per failure"""
+        with self._lock:
+            if generation != self._generation:
+                return  # another caller already restarted it
+            old = self._executor
+            self._start_executor()
+            self.restarts += 1
+        old.shutdown(wait=False, cancel_futures=True)
+
+    def reload(self):
+        """Start fresh workers on the current model files
+
+        Chunks already queued finish on the old workers, which exit once
+        they are done.
+        """
+        with self._lock:
+            old = self._executor
+            self._start_executor()
+        old.shutdown(wait=False)
+
+    def _submit(self, texts):
+        """Queue one chunk, rebuilding the executor if it is already broken"""
+        for attempt in range(self.max_retries + 1):
+            with self._lock:
+                generation = self._generation
+                try:
+                    return self._executor.submit(_score_chunk, texts), generation
+                except BrokenProcessPool:
+                    if attempt == self.max_retries:
+                        raise
+            self._restart(generation)
+
+    def _record(self, pid, busy):
+        with self._lock:
+            self._busy[pid] = self._busy.get(pid, 0.0) + busy
+            self._chunks[pid] = self._chunks.get(pid, 0) + 1
+
+    def _result(self, texts, future, generation):
+        """Wait for one chunk, resubmitting it if its worker crashed
+
+        Returns (model version, probabilities).
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                pid, version, probas, busy = future.result()
+                self._record(pid, busy)
+                return version, probas
+            except BrokenProcessPool:
+                if attempt == self.max_retries:
+                    raise
+                self._restart(generation)
+                future, generation = self._submit(texts)
+
+    def predict_proba(self, texts, version=None):
+        """Score a list of texts across the pool, preserving input order
+
+        With a version, texts scored by workers that loaded a different
+        model get None instead of probabilities.
+        """
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        pending = [(chunk,) + self._submit(chunk) for chunk in chunks]
+        probas = []
+        for chunk, future, generation in pending:
+            scored_with, chunk_probas = self._result(chunk, future, generation)
+            if version is not None and scored_with != version:
+                with self._lock:
+                    self.version_mismatches += len(chunk)
+                chunk_probas = [None] * len(chunk)
+            probas.extend(chunk_probas)
+        return probas
+
+    def map_chunks(self, chunks, max_in_flight=None):
+        """Score an iterable of text chunks, yielding probabilities in order
+
+        At most max_in_flight chunks are queued at once, so memory stays
+        bounded even for an unbounded input stream.
+        """
+        max_in_flight = max_in_flight or self.workers * 2
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk,) + self._submit(chunk))
+            if len(pending) >= max_in_flight:
+                yield self._result(*pending.popleft())[1]
+        while pending:
+            yield self._result(*pending.popleft())[1]
+
+    def stats(self):
+        """Per-worker utilization (busy time / pool uptime) and restart count"""
+        with self._lock:
+            uptime = time.perf_counter() - self._started
+            workers = {
+                str(pid): {
+                    'chunks': self._chunks[pid],
+                    'busy_seconds': round(busy, 3),
+                    'utilization': round(busy / uptime, 4) if uptime > 0 else 0.0
+                }
+                for pid, busy in self._busy.items()
+            }
+            return {
+                'workers': self.workers,
+                'restarts': self.restarts,
+                'version_mismatches': self.version_mismatches,
+                'uptime_seconds': round(uptime, 3),
+                'per_worker': workers
+            }
+
+    def shutdown(self):
+        """Stop all worker processes"""
+        with self._lock:
+            self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,168 @@
+"""
+Disk-backed cache for SerpApi search responses
+
+Responses are keyed on the final query parameters (without the API key).
+Entries younger than `ttl` are served directly; entries between `ttl` and
+`stale_ttl` are served immediately while a background refresh fetches a
+new copy (stale-while-revalidate). In offline mode only cached responses
+are served, which makes verification runs repeatable without network.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+MODES = ('online', 'offline', 'off')
+_LOOKUP_RESULTS = {'hits': 'hit', 'stale_hits': 'stale_hit', 'misses': 'miss'}
+
+def search_key(params):
+    """Stable key for a search request, ignoring credentials"""
+    public = {k: v for k, v in params.items() if k != 'api_key'}
+    encoded = json.dumps(public, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+class SearchCache:
+    """SQLite cache of search responses with TTL, size bound and background refresh"""
+
+    def __init__(self, path='search_cache.db', ttl=7 * 86400, stale_ttl=30 * 86400,
+                 max_entries=50000, mode='online'):
+        if mode not in MODES:
+            raise ValueError(f"Unknown search cache mode: {mode!r} (expected one of {MODES})")
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max_entries
+        self.mode = mode
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._counts = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'evictions': 0}
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS searches ('
+                'key TEXT PRIMARY KEY, query TEXT, response TEXT NOT NULL, '
+                'fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_searches_accessed ON searches (accessed_at)')
+
+    def _connect(self):
+        """One connection per thread, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+        if name in _LOOKUP_RESULTS:
+            CACHE_LOOKUPS.inc(cache='search', result=_LOOKUP_RESULTS[name])
+
+    def get(self, key):
+        """Return (response, age in seconds) or None"""
+        conn = self._connect()
+        row = conn.execute('SELECT response, fetched_at FROM searches WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        with conn:
+            conn.execute('UPDATE searches SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0]), now - row[1]
+
+    def put(self, key, response, query=None):
+        """Store a response and evict the least recently used rows beyond max_entries"""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO searches (key, query, response, fetched_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, query, json.dumps(response), now, now)
+            )
+            excess = conn.execute('SELECT COUNT(*) FROM searches').fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    'DELETE FROM searches WHERE key IN '
+                    '(SELECT key FROM searches ORDER BY accessed_at LIMIT ?)', (excess,)
+                )
+                with self._lock:
+                    self._counts['evictions'] += excess
+
+    def stats(self):
+        """Hit/miss/refresh/eviction counters"""
+        with self._lock:
+            return dict(self._counts)
+
+    def _refresh(self, key, params, fetch):
+        """Fetch a new copy of a stale entry in the background"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                response = fetch(params)
+                if response and 'error' not in response:
+                    self.put(key, response, params.get('q'))
+                    self._count('refreshes')
+            except Exception as e:
+                logger.warning("Background search refresh failed: %s", e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def fetch(self, params, fetch):
+        """Return a response for params, calling fetch(params) only when needed
+
+        Error responses are never cached. Returns None in offline mode when
+        nothing is cached.
+        """
+        if self.mode == 'off':
+            return fetch(params)
+
+        key = search_key(params)
+        cached = self.get(key)
+        if cached is not None:
+            response, age = cached
+            if age <= self.ttl or self.mode == 'offline':
+                self._count('hits')
+                return response
+            if age <= self.stale_ttl:
+                self._count('stale_hits')
+                self._refresh(key, params, fetch)
+                return response
+
+        self._count('misses')
+        if self.mode == 'offline':
+            return None
+
+        response = fetch(params)
+        if response and 'error' not in response:
+            self.put(key, response, params.get('q'))
+        return response
+
+def from_env():
+    """Build the search cache from SEARCH_CACHE_* environment variables"""
+    return SearchCache(
+        path=os.getenv('SEARCH_CACHE_PATH', 'search_cache.db'),
+        ttl=float(os.getenv('SEARCH_CACHE_TTL', str(7 * 86400))),
+        stale_ttl=float(os.getenv('SEARCH_CACHE_STALE_TTL', str(30 * 86400))),
+        max_entries=int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '50000')),
+        mode=os.getenv('SEARCH_CACHE_MODE', 'online')
+    )
@@ -0,0 +1,170 @@
+"""
+Shared text normalizer for training and serving
+
+One TextNormalizer instance is saved on the fitted vectorizer
+(``vectorizer.normalizer_``) by the training script, so every consumer of
+the artifact cleans text exactly the way the model was trained.
+"""
+
+import re
+import time
+
+# Characters that are neither word characters nor whitespace
+_NON_WORD = re.compile(r'[^\w\s]+')
+# URLs, then HTML tags, then [bracketed] asides. They are removed one after
+# the other, as the old clean_text_simple did: when they overlap (a URL
+# inside a tag or brackets) a single alternation would keep different text
+_ARTICLE_NOISE = (
+    re.compile(r'https?://\S+|www\.\S+'),
+    re.compile(r'<.*?>'),
+    re.compile(r'\[.*?\]'),
+)
+_NON_LETTER = re.compile(r'[^a-zA-Z\s\.\!\?]+')
+
+# Character used to join a batch into one string; it is not a word
+# character, so it is always safe to strip it from the input first
+_BATCH_SEP = '\x01'
+
+def _ascii_table(keep, replacement, also_keep=''):
+    """Translate table for ASCII: characters not matching `keep` become `replacement`"""
+    keep = re.compile(keep)
+    return {
+        c: replacement
+        for c in range(128)
+        if not keep.match(chr(c)) and chr(c) not in also_keep
+    }
+
+_BASIC_TABLE = _ascii_table(r'[\w\s]', None)
+_BASIC_BATCH_TABLE = _ascii_table(r'[\w\s]', None, also_keep=_BATCH_SEP)
+_ARTICLE_TABLE = _ascii_table(r'[a-zA-Z\s\.\!\?]', ' ')
+
+class TextNormalizer:
+    """Lowercase and strip text before vectorizing
+
+    Modes:
+      basic   - drop everything except word characters and whitespace
+      article - also drop URLs, HTML tags and [brackets], keep only
+                letters and . ! ?
+    """
+
+    MODES = ('basic', 'article')
+
+    def __init__(self, mode='basic'):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown normalizer mode: {mode!r} (expected one of {self.MODES})")
+        self.mode = mode
+
+    def __repr__(self):
+        return f"TextNormalizer(mode={self.mode!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, TextNormalizer) and other.mode == self.mode
+
+    def __hash__(self):
+        return hash(self.mode)
+
+    def __call__(self, text):
+        return self.normalize(text)
+
+    def normalize(self, text):
+        """Normalize one text"""
+        text = str(text).lower()
+        if self.mode == 'basic':
+            if text.isascii():
+                text = text.translate(_BASIC_TABLE)
+            else:
+                text = _NON_WORD.sub('', text)
+        else:
+            for pattern in _ARTICLE_NOISE:
+                text = pattern.sub('', text)
+            if text.isascii():
+                text = text.translate(_ARTICLE_TABLE)
+            else:
+                text = _NON_LETTER.sub(' ', text)
+        return ' '.join(text.split())
+
+    def normalize_many(self, texts):
+        """Normalize a list of texts
+
+        In basic mode an all-ASCII batch is lowercased and translated as a
+        single string, which avoids the per-call overhead of normalize().
+        """
+        texts = [str(text) for text in texts]
+        if self.mode == 'basic' and texts:
+            joined = _BATCH_SEP.join(text.replace(_BATCH_SEP, '') for text in texts)
+            if joined.isascii():
+                parts = joined.lower().translate(_BASIC_BATCH_TABLE).split(_BATCH_SEP)
+                return [' '.join(part.split()) for part in parts]
+        normalize = self.normalize
+        return [normalize(text) for text in texts]
+
+def normalizer_for(vectorizer):
+    """Return the normalizer saved with a vectorizer
+
+    Artifacts trained before the normalizer was stored on the vectorizer
+    were all cleaned with the basic rules.
+    """
+    normalizer = getattr(vectorizer, 'normalizer_', None)
+    return normalizer if normalizer is not None else TextNormalizer('basic')
+
+def _legacy_clean_text(text):
+    """Previous app.py / train_simple_working.py cleaning, kept for benchmarking"""
+    text = str(text).lower()
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+def _legacy_clean_text_simple(text):
+    """Previous predict_simple.py cleaning, kept for benchmarking"""
+    text = str(text).lower()
+    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    text = re.sub(r'<.*?>', '', text)
+    text = re.sub(r'\[.*?\]', '', text)
+    text = re.sub(r'[^a-zA-Z\s\.\!\?]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+def benchmark(n_docs=5000, repeat=3):
+    """Compare the normalizer against the previous cleaning functions"""
+    sample = ("BREAKING!!! Scientists at <b>NASA</b> confirm [citation needed] the "
+              "Mars rover found water; see https://example.com/story?id=42 for more... "
+              "Experts (and critics) say it's a 'game-changer' - 100% sure. ")
+    texts = [sample * (1 + i % 5) for i in range(n_docs)]
+
+    def best_of(fn):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    basic = TextNormalizer('basic')
+    article = TextNormalizer('article')
+    assert [_legacy_clean_text(t) for t in texts[:50]] == basic.normalize_many(texts[:50])
+    overlapping = ['<a href=http://x.com/>Hello world</a> ok', '[see http://x.com] more']
+    assert [_legacy_clean_text_simple(t) for t in texts[:50] + overlapping] == \
+        article.normalize_many(texts[:50] + overlapping)
+
+    rows = [
+        ('legacy clean_text', best_of(lambda: [_legacy_clean_text(t) for t in texts])),
+        ('basic normalize', best_of(lambda: [basic.normalize(t) for t in texts])),
+        ('basic normalize_many', best_of(lambda: basic.normalize_many(texts))),
+        ('legacy clean_text_simple', best_of(lambda: [_legacy_clean_text_simple(t) for t in texts])),
+        ('article normalize', best_of(lambda: [article.normalize(t) for t in texts])),
+        ('article normalize_many', best_of(lambda: article.normalize_many(texts))),
+    ]
+
+    print(f"\nNormalizing {n_docs} documents (best of {repeat}):")
+    for name, seconds in rows:
+        print(f"  {name:<26} {seconds * 1000:8.1f} ms  ({n_docs / seconds:,.0f} docs/sec)")
+    print(f"\n  basic speedup:   {rows[0][1] / rows[2][1]:.1f}x")
+    print(f"  article speedup: {rows[3][1] / rows[5][1]:.1f}x\n")
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench':
+        benchmark()
+    else:
+        print("Usage: python text_normalizer.py --bench")
@@ -1,18 +1,40 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split, StratifiedKFold
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
-import re
+import itertools
+import pickle
+import random
+import sys
+import time
+from model_artifact import ARTIFACT_DIR, export_artifact, remove_artifact
+from text_normalizer import TextNormalizer
+
+MODEL_PATH = 'simple_model.pkl'
+VECTORIZER_PATH = 'simple_vectorizer.pkl'
+
+# Search space for --search (vectorizer settings x classifier settings)
+VECTORIZER_GRID = {
+    'max_features': [1000, 8000, 30000],
+    'ngram_range': [(1, 1), (1, 2)],
+    'sublinear_tf': [False, True],
+}
+CLASSIFIER_GRID = {
+    'C': [0.1, 1.0, 10.0],
+}
+
+# String labels accepted in labelled files (numbers are used as-is: 0 = fake, 1 = real)
+LABEL_NAMES = {'fake': 0, 'false': 0, 'real': 1, 'true': 1}
+
+# Saved with the vectorizer so serving cleans text exactly like training
+NORMALIZER = TextNormalizer('basic')
 
 def clean_text(text):
     """Basic text cleaning"""
-    text = str(text).lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    return NORMALIZER.normalize(text)
 
 def create_sample_data():
     """Create a more comprehensive dataset"""
@@ -55,7 +77,7 @@ def train_model():
     # Create and prepare data
     print("Creating sample dataset...")
     df = create_sample_data()
-    df['cleaned_text'] = df['text'].apply(clean_text)
+    df['cleaned_text'] = NORMALIZER.normalize_many(df['text'].tolist())
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(
@@ -87,12 +109,274 @@ def train_model():
     print("\nClassification Report:")
     print(classification_report(y_test, y_pred, target_names=['Fake', 'Real']))
     
-    # Save model
-    joblib.dump(model, 'simple_model.pkl')
-    joblib.dump(vectorizer, 'simple_vectorizer.pkl')
+    # Save model (the normalizer travels with the vectorizer)
+    vectorizer.normalizer_ = NORMALIZER
+    joblib.dump(model, MODEL_PATH)
+    joblib.dump(vectorizer, VECTORIZER_PATH)
+    manifest = export_artifact(vectorizer, model, ARTIFACT_DIR)
+    print("\nModel saved successfully!")
+    print(f"Compact artifact exported to {ARTIFACT_DIR}/ ({manifest['checksum'][:12]})")
+    
+    return model, vectorizer
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, if the platform reports it"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 1e6
+    except ImportError:
+        return None
+
+def _parse_source(source):
+    """Split 'path=label' into (path, label); label is None when not given"""
+    path, sep, label = source.rpartition('=')
+    if sep and label in ('0', '1'):
+        return path, int(label)
+    return source, None
+
+def _to_labels(values):
+    """Convert a label column (0/1 or fake/real style strings) to an int array"""
+    if values.dtype == object:
+        values = values.astype(str).str.strip().str.lower().map(
+            lambda v: LABEL_NAMES.get(v, int(v) if v.isdigit() else -1)
+        )
+    labels = values.astype(int).to_numpy()
+    if ((labels != 0) & (labels != 1)).any():
+        raise ValueError("Labels must be 0/1 or one of: " + ", ".join(LABEL_NAMES))
+    return labels
+
+def read_labelled_chunks(sources, chunk_size=10000, text_field='text', label_field='label'):
+    """Yield (texts, labels) chunks from labelled CSV/JSONL files
+
+    Sources may be 'path' (labels read from label_field) or 'path=0' /
+    'path=1' for files where every row has the same label (e.g. Fake.csv,
+    True.csv). Each yielded chunk holds up to chunk_size rows from every
+    file, so classes stay mixed for incremental training.
+    """
+    readers = []
+    for source in sources:
+        path, fixed_label = _parse_source(source)
+        if path.lower().endswith('.csv'):
+            reader = pd.read_csv(path, chunksize=chunk_size)
+        else:
+            reader = pd.read_json(path, lines=True, chunksize=chunk_size)
+        readers.append((iter(reader), fixed_label))
+
+    while readers:
+        texts = []
+        labels = []
+        for reader in list(readers):
+            chunk_iter, fixed_label = reader
+            chunk = next(chunk_iter, None)
+            if chunk is None:
+                readers.remove(reader)
+                continue
+            chunk = chunk.dropna(subset=[text_field])
+            if fixed_label is None:
+                labels.append(_to_labels(chunk[label_field]))
+            else:
+                labels.append(np.full(len(chunk), fixed_label))
+            texts.extend(chunk[text_field].astype(str).tolist())
+        if texts:
+            yield texts, np.concatenate(labels)
+
+def train_streaming(sources, chunk_size=10000, n_features=2**20, text_field='text', label_field='label'):
+    """Train out-of-core on labelled files with a hashing vectorizer and partial_fit
+
+    Memory is bounded by the chunk size: the hashing vectorizer keeps no
+    vocabulary and the SGD classifier is updated one chunk at a time.
+    Accuracy is measured progressively (each chunk is scored before the
+    model trains on it).
+    """
+    print("Starting streaming model training...")
+    vectorizer = HashingVectorizer(
+        n_features=n_features,
+        stop_words='english',
+        alternate_sign=False,
+        norm='l2'
+    )
+    model = SGDClassifier(loss='log_loss', alpha=1e-6, random_state=42)
+    classes = np.array([0, 1])
+    rng = np.random.default_rng(42)
+    
+    docs = 0
+    scored = 0
+    correct = 0
+    start = time.perf_counter()
+    for n, (texts, labels) in enumerate(read_labelled_chunks(sources, chunk_size, text_field, label_field), 1):
+        order = rng.permutation(len(texts))
+        texts = [texts[i] for i in order]
+        labels = labels[order]
+        
+        X = vectorizer.transform(NORMALIZER.normalize_many(texts))
+        if docs:
+            correct += int((model.predict(X) == labels).sum())
+            scored += len(labels)
+        model.partial_fit(X, labels, classes=classes)
+        
+        docs += len(texts)
+        elapsed = time.perf_counter() - start
+        accuracy = f"{correct / scored:.4f}" if scored else "n/a"
+        print(f"chunk {n}: {docs} docs, {docs / elapsed:.0f} docs/sec, progressive accuracy {accuracy}")
+    
+    if not docs:
+        print("No training data found.")
+        return None, None
+    
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mb()
+    print("\nStreaming training complete:")
+    print(f"  Documents:  {docs}")
+    print(f"  Throughput: {docs / elapsed:.0f} docs/sec ({elapsed:.1f}s)")
+    if scored:
+        print(f"  Progressive accuracy: {correct / scored:.4f}")
+    print(f"  Peak RSS:   {peak:.0f} MB" if peak is not None else "  Peak RSS:   unavailable")
+    
+    # Save model (the normalizer travels with the vectorizer)
+    vectorizer.normalizer_ = NORMALIZER
+    joblib.dump(model, MODEL_PATH)
+    joblib.dump(vectorizer, VECTORIZER_PATH)
+    # Hashed features have no vocabulary to export; drop any older compact
+    # artifact so it can't shadow the new model
+    remove_artifact(ARTIFACT_DIR)
     print("\nModel saved successfully!")
     
     return model, vectorizer
 
+def _expand_grid(grid):
+    """All combinations of a {param: [values]} grid as a list of dicts"""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+def _evaluate_fold(vec_params, clf_settings, texts, labels, train_idx, test_idx):
+    """Fit the vectorizer once for a fold and evaluate every classifier setting on it"""
+    vectorizer = TfidfVectorizer(stop_words='english', **vec_params)
+    train_texts = [texts[i] for i in train_idx]
+    test_texts = [texts[i] for i in test_idx]
+    
+    start = time.perf_counter()
+    X_train = vectorizer.fit_transform(train_texts)
+    vectorize_seconds = time.perf_counter() - start
+    X_test = vectorizer.transform(test_texts)
+    vectorizer_size = len(pickle.dumps(vectorizer))
+    samples = test_texts[:20]
+    
+    rows = []
+    for clf_params in clf_settings:
+        model = LogisticRegression(max_iter=1000, random_state=42, **clf_params)
+        start = time.perf_counter()
+        model.fit(X_train, labels[train_idx])
+        fit_seconds = time.perf_counter() - start
+        score = accuracy_score(labels[test_idx], model.predict(X_test))
+        
+        # Single-document latency: transform + predict_proba, as the API does it
+        latencies = []
+        for text in samples:
+            start = time.perf_counter()
+            model.predict_proba(vectorizer.transform([text]))
+            latencies.append(time.perf_counter() - start)
+        
+        rows.append({
+            'vectorizer': vec_params,
+            'classifier': clf_params,
+            'score': score,
+            'fit_seconds': vectorize_seconds + fit_seconds,
+            'predict_ms': float(np.median(latencies)) * 1000,
+            'model_bytes': vectorizer_size + len(pickle.dumps(model))
+        })
+    return rows
+
+def hyperparameter_search(texts, labels, folds=5, n_iter=None, n_jobs=-1, output='leaderboard.csv'):
+    """Grid (or random, with n_iter) search with k-fold CV across all cores
+
+    Work is split into (vectorizer setting, fold) tasks. Each task fits
+    the vectorizer once and reuses that matrix for every classifier
+    setting, so TF-IDF is never recomputed per classifier.
+    """
+    settings = list(itertools.product(_expand_grid(VECTORIZER_GRID), _expand_grid(CLASSIFIER_GRID)))
+    if n_iter and n_iter < len(settings):
+        settings = random.Random(42).sample(settings, n_iter)
+    
+    grouped = {}
+    for vec_params, clf_params in settings:
+        grouped.setdefault(repr(sorted(vec_params.items())), (vec_params, []))[1].append(clf_params)
+    
+    labels = np.asarray(labels)
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=42).split(texts, labels))
+    print(f"Searching {len(settings)} settings x {folds} folds "
+          f"({len(grouped) * folds} vectorizer fits) on {len(texts)} documents...")
+    
+    start = time.perf_counter()
+    results = joblib.Parallel(n_jobs=n_jobs)(
+        joblib.delayed(_evaluate_fold)(vec_params, clf_settings, texts, labels, train_idx, test_idx)
+        for vec_params, clf_settings in grouped.values()
+        for train_idx, test_idx in splits
+    )
+    print(f"Search finished in {time.perf_counter() - start:.1f}s")
+    
+    # Average each setting over its folds
+    rows = pd.DataFrame([row for fold_rows in results for row in fold_rows])
+    rows['vectorizer'] = rows['vectorizer'].apply(lambda p: repr(sorted(p.items())))
+    rows['classifier'] = rows['classifier'].apply(lambda p: repr(sorted(p.items())))
+    board = rows.groupby(['vectorizer', 'classifier']).agg(
+        score=('score', 'mean'),
+        score_std=('score', 'std'),
+        fit_seconds=('fit_seconds', 'mean'),
+        predict_ms=('predict_ms', 'mean'),
+        model_bytes=('model_bytes', 'mean'),
+    ).reset_index().sort_values(['score', 'predict_ms'], ascending=[False, True])
+    
+    # Pareto front: no other setting is at least as accurate and faster
+    board['pareto'] = [
+        not ((board['score'] >= row.score) & (board['predict_ms'] < row.predict_ms)).any()
+        for row in board.itertuples()
+    ]
+    board.to_csv(output, index=False)
+    
+    print(f"\nLeaderboard (top 10, full table in {output}):")
+    with pd.option_context('display.width', 200, 'display.max_colwidth', 60):
+        print(board.head(10).to_string(index=False))
+    return board
+
 if __name__ == "__main__":
-    model, vectorizer = train_model()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Train the fake news detection model')
+    parser.add_argument('--stream', nargs='+', metavar='SOURCE',
+                        help='train out-of-core on labelled CSV/JSONL files; use PATH=0 / PATH=1 for single-label files')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='rows per training chunk')
+    parser.add_argument('--n-features', type=int, default=2**20, help='hashing vectorizer feature count')
+    parser.add_argument('--text-field', default='text', help='column holding the article text')
+    parser.add_argument('--label-field', default='label', help='column holding the label')
+    parser.add_argument('--search', action='store_true', help='run a cross-validated hyperparameter search')
+    parser.add_argument('--data', nargs='+', metavar='SOURCE', help='labelled files for --search (default: sample data)')
+    parser.add_argument('--folds', type=int, default=5, help='cross-validation folds for --search')
+    parser.add_argument('--n-iter', type=int, help='random search: number of settings to sample')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='parallel jobs for --search (-1 = all cores)')
+    parser.add_argument('--leaderboard', default='leaderboard.csv', help='where --search writes its results')
+    args = parser.parse_args()
+    
+    if args.search:
+        if args.data:
+            texts, labels = [], []
+            for chunk_texts, chunk_labels in read_labelled_chunks(args.data, args.chunk_size,
+                                                                  args.text_field, args.label_field):
+                texts.extend(chunk_texts)
+                labels.extend(chunk_labels)
+        else:
+            df = create_sample_data()
+            texts, labels = df['text'].tolist(), df['label'].tolist()
+        hyperparameter_search(NORMALIZER.normalize_many(texts), labels, args.folds,
+                              args.n_iter, args.n_jobs, args.leaderboard)
+    elif args.stream:
+        model, vectorizer = train_streaming(args.stream, args.chunk_size, args.n_features,
+                                            args.text_field, args.label_field)
+    else:
+        model, vectorizer = train_model()
\ No newline at end of file
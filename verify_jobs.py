@@ -0,0 +1,304 @@
+"""
+Background fact-check jobs for the API
+
+Full verification (claim extraction, searches, embeddings) takes seconds,
+so the API queues it instead of holding a request open:
+
+  VerifyQueue  - bounded local worker pool running claim_extractor.verify_article
+  JobStore     - job state in SQLite, so any API worker process can report
+                 on any job
+
+Identical texts that are already queued or running share one job, and a
+text that is a near-duplicate of an already verified one (see
+near_duplicate.py) gets that job's report without being checked again.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+ACTIVE = ('queued', 'running')
+ORPHANED = 'The worker process running the job exited before it finished'
+
+class QueueFull(Exception):
+    """Raised when the verification queue is at capacity"""
+
+def text_hash(text):
+    return hashlib.sha256(text.strip().encode('utf-8')).hexdigest()
+
+def _alive(pid):
+    """Whether a process with this pid still exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class JobStore:
+    """SQLite table of verification jobs shared by every API process"""
+
+    def __init__(self, path='verify_jobs.db', ttl=86400):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id TEXT PRIMARY KEY, text_hash TEXT NOT NULL, status TEXT NOT NULL, '
+                'owner INTEGER, progress TEXT, result TEXT, error TEXT, '
+                'created_at REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_hash ON jobs (text_hash, status)')
+
+    def _connect(self):
+        """One connection per thread, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _insert(self, conn, job_id, digest):
+        now = time.time()
+        conn.execute(
+            'INSERT INTO jobs (id, text_hash, status, owner, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?)', (job_id, digest, 'queued', os.getpid(), now, now)
+        )
+        if self.ttl:
+            conn.execute('DELETE FROM jobs WHERE updated_at < ? AND status NOT IN (?, ?)',
+                         (now - self.ttl,) + ACTIVE)
+
+    def create(self, job_id, digest):
+        conn = self._connect()
+        with conn:
+            self._insert(conn, job_id, digest)
+
+    def _active(self, conn, digest):
+        """ID of the oldest live active job for a text; jobs of dead owners are failed on the way"""
+        rows = conn.execute(
+            'SELECT id, owner FROM jobs WHERE text_hash = ? AND status IN (?, ?) ORDER BY created_at',
+            (digest,) + ACTIVE
+        ).fetchall()
+        for job_id, owner in rows:
+            if owner is None or _alive(owner):
+                return job_id
+            self._fail_orphan(conn, job_id)
+        return None
+
+    def _fail_orphan(self, conn, job_id):
+        conn.execute('UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)',
+                     ('failed', ORPHANED, time.time(), job_id) + ACTIVE)
+
+    def find_or_create(self, job_id, digest):
+        """Create a queued job unless the text already has a live active one
+
+        Returns (job_id, created). The lookup and insert run in one
+        BEGIN IMMEDIATE transaction, so two processes submitting the same
+        text at once end up sharing a job.
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            existing = self._active(conn, digest)
+            if existing is not None:
+                return existing, False
+            self._insert(conn, job_id, digest)
+        return job_id, True
+
+    def update(self, job_id, status=None, progress=None, result=None, error=None):
+        fields = {'updated_at': time.time()}
+        if status is not None:
+            fields['status'] = status
+        if progress is not None:
+            fields['progress'] = json.dumps(progress)
+        if result is not None:
+            fields['result'] = json.dumps(result)
+        if error is not None:
+            fields['error'] = error
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        conn = self._connect()
+        with conn:
+            conn.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id))
+
+    def find_active(self, digest):
+        """ID of a queued or running job for the same text whose owner is still alive, if any"""
+        conn = self._connect()
+        with conn:
+            return self._active(conn, digest)
+
+    def get(self, job_id):
+        """The job as a dict, or None
+
+        An active job whose owner process has died is reported (and
+        stored) as failed.
+        """
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT id, status, progress, result, error, created_at, updated_at, owner FROM jobs WHERE id = ?',
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job_id, status, progress, result, error, created_at, updated_at, owner = row
+        if status in ACTIVE and owner is not None and not _alive(owner):
+            with conn:
+                self._fail_orphan(conn, job_id)
+            status, error = 'failed', ORPHANED
+        return {
+            'job_id': job_id,
+            'status': status,
+            'progress': json.loads(progress) if progress else None,
+            'result': json.loads(result) if result else None,
+            'error': error,
+            'created_at': created_at,
+            'updated_at': updated_at
+        }
+
+    def fail_unfinished(self, owner, reason):
+        """Fail the active jobs of one process, e.g. when it shuts down"""
+        conn = self._connect()
+        with conn:
+            conn.execute('UPDATE jobs SET status = ?, error = ?, updated_at = ? '
+                         'WHERE owner = ? AND status IN (?, ?)',
+                         ('failed', reason, time.time(), owner) + ACTIVE)
+
+def _progress_of(report):
+    """The parts of a partial verify_article() report worth showing while it runs"""
+    claims = report['claims']
+    return {
+        'claims_total': len(claims),
+        'claims_done': sum(entry['status'] != 'pending' for entry in claims),
+        'claims': [{'claim': e['claim'], 'verdict': e['verdict'], 'status': e['status']} for e in claims]
+    }
+
+class VerifyQueue:
+    """Run verify_article() jobs on a local thread pool with a bounded backlog"""
+
+    def __init__(self, store, workers=2, max_pending=100, api_key=None, verify=None, near_duplicates=None):
+        self.store = store
+        self.near_duplicates = near_duplicates
+        self.max_pending = max_pending
+        self.api_key = api_key
+        self._verify = verify
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='verify')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.stats = {'submitted': 0, 'deduplicated': 0, 'rejected': 0, 'completed': 0, 'failed': 0,
+                      'near_duplicates': 0}
+
+    def submit(self, text):
+        """Queue a text; returns (job_id, deduplicated). Raises QueueFull at capacity."""
+        digest = text_hash(text)
+        signature = self.near_duplicates.signature(text) if self.near_duplicates is not None else None
+        with self._lock:
+            existing = self.store.find_active(digest)
+            if existing is not None:
+                self.stats['deduplicated'] += 1
+                return existing, True
+            job_id = self._reuse_near_duplicate(text, digest, signature)
+            if job_id is not None:
+                self.stats['near_duplicates'] += 1
+                return job_id, True
+            if self._pending >= self.max_pending:
+                self.stats['rejected'] += 1
+                raise QueueFull(f"{self._pending} verification jobs already pending")
+            job_id, created = self.store.find_or_create(uuid.uuid4().hex, digest)
+            if not created:
+                self.stats['deduplicated'] += 1
+                return job_id, True  # another process queued the same text meanwhile
+            self._pending += 1
+            self.stats['submitted'] += 1
+        self._executor.submit(self._run, job_id, text, signature)
+        return job_id, False
+
+    def _reuse_near_duplicate(self, text, digest, signature):
+        """Finish a new job at once with the report of a near-duplicate finished job, if any"""
+        if signature is None:
+            return None
+        match = self.near_duplicates.lookup(text, signature)
+        if match is None:
+            return None
+        original_id, similarity = match
+        original = self.store.get(original_id)
+        if original is None or original['status'] != 'done':
+            return None  # expired from the store
+        report = dict(original['result'], near_duplicate={'job_id': original_id, 'similarity': round(similarity, 3)})
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, digest)
+        self.store.update(job_id, status='done', progress=original['progress'], result=report)
+        return job_id
+
+    def _run(self, job_id, text, signature=None):
+        verify = self._verify
+        if verify is None:
+            from claim_extractor import verify_article as verify
+        try:
+            self.store.update(job_id, status='running')
+            report = verify(text, self.api_key,
+                            progress=lambda partial: self.store.update(job_id, progress=_progress_of(partial)))
+            self.store.update(job_id, status='done', progress=_progress_of(report), result=report)
+            if signature is not None and not report.get('timed_out'):
+                self.near_duplicates.add(text, job_id, signature)
+            outcome = 'completed'
+        except Exception as e:
+            self.store.update(job_id, status='failed', error=str(e))
+            outcome = 'failed'
+        with self._lock:
+            self._pending -= 1
+            self.stats[outcome] += 1
+
+    def describe(self):
+        with self._lock:
+            description = dict(self.stats, pending=self._pending, max_pending=self.max_pending)
+        if self.near_duplicates is not None:
+            description['near_duplicate_index'] = self.near_duplicates.stats()
+        return description
+
+    def wait(self, job_id, timeout, interval=0.2):
+        """The job once it has finished, or as it stands when the timeout runs out"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None or job['status'] not in ACTIVE or time.monotonic() >= deadline:
+                return job
+            time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+
+    def events(self, job_id, interval=0.5, timeout=5, retry=1000):
+        """Server-sent events: the job each time it changes, until it finishes
+
+        The stream ends after timeout seconds even if the job is still
+        running, so it doesn't hold a request thread for the whole job;
+        EventSource clients reconnect after `retry` milliseconds and get
+        the job's current state first.
+        """
+        yield f"retry: {retry}\n\n"
+        last = None
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.store.get(job_id)
+            if job is None:
+                yield f"event: error\ndata: {json.dumps({'error': 'Job not found'})}\n\n"
+                return
+            if job['updated_at'] != last:
+                last = job['updated_at']
+                yield f"data: {json.dumps(job)}\n\n"
+            if job['status'] not in ACTIVE:
+                return
+            time.sleep(interval)
+
+    def shutdown(self):
+        """Stop the workers and fail whatever this process hadn't finished"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.store.fail_unfinished(os.getpid(), 'Server shut down before the job finished')
@@ -0,0 +1,27 @@
+"""
+Production entry point for the API
+
+    gunicorn -c gunicorn.conf.py wsgi:app     (Linux/macOS)
+    python wsgi.py                            (Windows, served by waitress)
+
+Importing this module loads the model, so servers that preload the app
+load it once and share it with every worker they fork.
+"""
+
+import os
+
+from app import create_app, shutdown, start_model_watcher
+
+app = create_app()
+
+if __name__ == '__main__':
+    from waitress import serve
+
+    host, _, port = os.getenv('WEB_BIND', '0.0.0.0:5000').rpartition(':')
+    threads = int(os.getenv('WEB_THREADS', '8'))
+    start_model_watcher()
+    print(f"Serving on http://{host}:{port} with {threads} threads (Ctrl+C to stop)")
+    try:
+        serve(app, host=host, port=int(port), threads=threads)
+    finally:
+        shutdown()